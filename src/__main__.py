@@ -1,39 +1,87 @@
 import asyncio
+import math
+import pathlib
+import time
 
 import typer
 from loguru import logger
 
 import src.logging
 from src import utils
+from src.backend.playwright import PlaywrightBackend
+from src.checkpoint import Checkpoints
 from src.logic.all import AllLogic
+from src.metrics_server import MetricsServer
+from src.profiler import Profiler
+from src.route import RouteRecorder, read_route
+from src.telemetry import TelemetryRing
 
 
 @utils.async_to_sync
 async def main(
     logging_level: src.logging.LoggingLevel = "info",  # type: ignore[assignment] # typer magic
+    target_cps: float = 50,  # the game ignores clicks, that come faster than that
+    golden_cookie_observer: bool = False,
+    push_state: bool = True,
+    headless: bool = False,
+    mirror: pathlib.Path | None = None,  # serve the game from here, downloading only what is missing
+    preset: pathlib.Path | None = None,  # boot already configured from this save, creating it if it doesn't exist
+    metrics_port: int | None = None,  # serve metrics on this port, while the run is in progress
+    profile: pathlib.Path | None = None,  # profile Python and the game's JS, and save a flamegraph here
+    record: pathlib.Path = pathlib.Path("routes"),  # every run records its purchases into a new file here
+    replay: pathlib.Path | None = None,  # make purchases from this route first (binary, or CSV), then play as usual
+    telemetry: pathlib.Path | None = None,  # write per-tick history of the run into this file
+    target: float = 1_000_000,  # stop when the balance is over this
+    endurance: bool = False,  # play forever, ignoring `--target`
+    log_file: pathlib.Path | None = None,  # also write logs here, as JSON lines
+    daemon: str | None = None,  # lease an already loaded game from this browser daemon (`python -m src.daemon`)
+    checkpoint: pathlib.Path | None = None,  # keep the save here, continue from it after a crash, or on the next start
 ) -> None:
-    src.logging.setup_logging(logging_level)
+    if daemon is not None and checkpoint is not None:
+        raise typer.BadParameter(
+            "the daemon owns its games, so they can't be restarted from a checkpoint", param_hint="--checkpoint"
+        )
+    src.logging.setup_logging(logging_level, log_file)
+    if endurance:
+        target = math.inf
     logger.info("Hello World!")
 
-    async with AllLogic.init() as logic:
-        await logic.remove_ads()
-        await logic.set_settings()
-        await logic.open_stats_page()
-        await logic.rename_bakery()
-        await logic.click_cookie_in_the_background()
+    checkpoints = Checkpoints(checkpoint) if checkpoint is not None else None
+    save = checkpoints.read() if checkpoints is not None else None
+    if save is not None:
+        logger.info(f"Continuing from the checkpoint in {checkpoint}")
+
+    async with AllLogic.init(headless=headless, mirror=mirror, preset=preset, daemon=daemon, save=save) as logic:
+        if metrics_port is not None:
+            await MetricsServer(logic.metrics, port=metrics_port).start()
+        await logic.setup(target_cps, golden_cookie_observer=golden_cookie_observer, push_state=push_state)
+        if checkpoints is not None:
+            logic.start_checkpoints(checkpoints)
         logger.success("All setup done! Starting to run infinite loop!")
 
-        while logic.balance <= 1_000_000:
-            await logic.collect_golden_cookies()
-            await logic.update_balance()
-            await logic.buy_buildings()
-            await logic.buy_upgrades()
-            logger.trace("Cycle done, balance is: {}", logic.balance)
-            await asyncio.sleep(1)
+        profiler = None
+        if profile is not None:
+            page = logic.backend.page if isinstance(logic.backend, PlaywrightBackend) else None
+            profiler = Profiler(logic.metrics, profile, page)
+            await profiler.start()
+
+        logic.recorder = RouteRecorder(record / time.strftime("%Y-%m-%d_%H-%M-%S.route"))
+        if telemetry is not None:
+            logic.telemetry = TelemetryRing(telemetry)
+        try:
+            if replay is not None:
+                await logic.replay(read_route(replay))
+            await logic.run(target)
+        finally:
+            logic.recorder.close()
+            if logic.telemetry is not None:
+                logic.telemetry.close()
+            if profiler is not None:
+                await profiler.stop()
 
-        logger.success("Done! Balance is over 1 million!")
+        logger.success(f"Done! Balance is over {target:,.0f}!")
         logger.info("Sleeping for 10 minutes and exiting...")
-        await logic.page.wait_for_timeout(10 * 60 * 1000)
+        await asyncio.sleep(10 * 60)
 
 
 if __name__ == "__main__":
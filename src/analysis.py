@@ -0,0 +1,57 @@
+"""Reads telemetry of a run (see :mod:`src.telemetry`) as NumPy arrays, and summarizes it.
+
+Requires the optional ``analysis`` dependency group (``poetry install --with analysis``).
+"""
+import pathlib
+
+import numpy as np
+import numpy.typing as npt
+import typer
+
+from src.telemetry import FIELDS, HEADER, MAGIC, ROW
+
+DTYPE = np.dtype(
+    {
+        "names": FIELDS,
+        "formats": ["<f8", "<f8", "<f8", "<f8", "<u4", "<f4"],
+        "offsets": [0, 8, 16, 24, 32, 36],
+        "itemsize": ROW.size,
+    }
+)
+
+
+def read_telemetry(path: pathlib.Path) -> list[npt.NDArray[np.void]]:
+    """Views of the ring buffer in chronological order, without copying (one, or two if it has wrapped).
+
+    Use :func:`numpy.concatenate` to get one array, which copies it.
+    """
+    with path.open("rb") as f:
+        magic, capacity, written = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a telemetry file")
+
+    rows = np.memmap(path, dtype=DTYPE, mode="r", offset=HEADER.size, shape=(capacity,))
+    if written <= capacity:
+        return [rows[:written]]
+    start = written % capacity
+    return [rows[start:], rows[:start]]
+
+
+def main(path: pathlib.Path) -> None:
+    chunks = read_telemetry(path)
+    first, last = chunks[0], chunks[-1]
+    if not len(first):
+        print("No ticks recorded")
+        return
+
+    latency = np.concatenate([chunk["latency"] for chunk in chunks])
+    print(f"Ticks: {len(latency)} (from {first['time'][0]:.1f}s to {last['time'][-1]:.1f}s)")
+    print(f"Balance: {last['balance'][-1]:,.0f}, CpS: {last['cps'][-1]:,.1f}, buildings: {last['buildings'][-1]}")
+    print(
+        f"Tick latency: median {np.median(latency) * 1000:.2f}ms, "
+        f"p90 {np.percentile(latency, 90) * 1000:.2f}ms, worst {latency.max() * 1000:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    typer.run(main)
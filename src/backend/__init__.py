@@ -0,0 +1,84 @@
+"""Backends are what the logic plays against: a real browser, or the offline simulator.
+
+Logic never touches the game directly, it only uses operations from :class:`GameBackend`.
+"""
+import asyncio
+import typing as t
+
+from src.state import RawState
+
+
+class RawClickCounts(t.TypedDict):
+    dispatched: float
+    """How many times we have clicked in total."""
+    accepted: str | None
+    """How many clicks the game has counted in total, as it shows them. ``None`` if unknown."""
+
+
+class GameBackend(t.Protocol):
+    round_trips: int
+    """How many times we have waited for the game to answer, not counting :meth:`prepare`."""
+
+    def clock(self) -> float:
+        """Current time in seconds, from any fixed point in the past."""
+
+    async def wait(self, seconds: float, wake: asyncio.Event) -> None:
+        """Let the game run for ``seconds``, or until ``wake`` is set."""
+
+    async def prepare(self) -> None:
+        """Everything that should be done before we start playing, e.g. setting settings."""
+
+    async def read_state(self) -> RawState:
+        ...
+
+    async def stream_state(self, callback: t.Callable[[RawState], None], interval: float) -> None:
+        """Call ``callback`` with changed parts of the state, as soon as they change.
+
+        Changes are sent not more often than once per ``interval`` seconds.
+        """
+
+    async def sync_state(self) -> None:
+        """Wait until :meth:`stream_state` has sent everything, that has changed so far, e.g. after a purchase."""
+
+    async def read_building_production(self, ids: list[int]) -> list[str | None]:
+        """How much one building of each of ``ids`` produces, as the game shows it. ``None`` if unknown."""
+
+    async def read_upgrade_prices(self, html_ids: list[str]) -> list[str | None]:
+        """Prices of upgrades, as the game shows them. ``None`` if we couldn't read it."""
+
+    async def buy_building(self, id: int) -> None:
+        ...
+
+    async def buy_upgrade(self, html_id: str) -> None:
+        ...
+
+    async def start_clicking(self, target_cps: float) -> None:
+        """Click the big cookie ``target_cps`` times per second, until told otherwise."""
+
+    async def stop_clicking(self) -> None:
+        ...
+
+    async def read_click_counts(self) -> RawClickCounts:
+        ...
+
+    async def collect_shimmers(self) -> None:
+        """Click all golden cookies (and other shimmers) on the screen."""
+
+    async def watch_shimmers(self, callback: t.Callable[[dict[str, str]], None]) -> None:
+        """Collect shimmers as soon as they appear, and call ``callback`` for each."""
+
+    async def read_health(self) -> dict[str, float]:
+        """Memory usage of the game and other numbers, that must not grow on long runs. Name -> value."""
+
+    async def read_latest_save(self) -> str | None:
+        """A recent save of the game, to continue from with :meth:`restart`. ``None`` if there is none yet."""
+
+    async def close(self) -> None:
+        """Throw the game away. It may fail, if the game has already crashed."""
+
+    async def restart(self, save: str | None) -> t.Self:
+        """Throw this game away, even if it has crashed or hung, and continue in a fresh one.
+
+        Args:
+            save: Continue from this save. If ``None``, start over.
+        """
@@ -0,0 +1,136 @@
+import asyncio
+import typing as t
+
+from src.backend import RawClickCounts
+from src.clicker import MAX_CPS
+from src.simulator import Simulator, UpgradeInfo
+from src.state import RawState
+
+
+class InMemoryBackend:
+    """Plays :class:`Simulator` instead of the real game, so logic can run without a browser.
+
+    Time doesn't pass on its own here: it passes only when logic waits, and it passes instantly.
+    """
+
+    STEP = 1.0
+    """How often (in game seconds) we look at the game while waiting, like a page would do."""
+
+    def __init__(self, simulator: Simulator) -> None:
+        self.simulator = simulator
+        self.round_trips = 0
+        """How many times we would have talked to the page, to compare with :class:`.PlaywrightBackend`."""
+        # like in the browser, nothing happens until we tell it to
+        simulator.clicks_per_second = 0
+        simulator.auto_collect_golden_cookies = False
+
+        self._stream: t.Callable[[RawState], None] | None = None
+        self._last_pushed: RawState = {}
+        self._on_shimmer: t.Callable[[dict[str, str]], None] | None = None
+        self._collected = simulator.golden_cookies_collected
+
+    def clock(self) -> float:
+        return self.simulator.time
+
+    async def wait(self, seconds: float, wake: asyncio.Event) -> None:
+        end = self.simulator.time + seconds
+        while self.simulator.time < end and not wake.is_set():
+            self.simulator.advance(min(self.STEP, end - self.simulator.time))
+            self._changed()
+        await asyncio.sleep(0)  # let other tasks run, as if we have really waited
+
+    async def prepare(self) -> None:
+        pass
+
+    async def read_state(self) -> RawState:
+        self.round_trips += 1
+        return self.simulator.snapshot()
+
+    async def stream_state(self, callback: t.Callable[[RawState], None], interval: float) -> None:
+        self.round_trips += 2
+        self._stream = callback
+        self._last_pushed = {}
+        self._changed()
+
+    async def sync_state(self) -> None:
+        self.round_trips += 1  # changes are already pushed, as soon as they happen
+
+    async def read_building_production(self, ids: list[int]) -> list[str | None]:
+        self.round_trips += 1
+        return [str(self.simulator.produces(id)) if self.simulator.owned[id] else None for id in ids]
+
+    async def read_upgrade_prices(self, html_ids: list[str]) -> list[str | None]:
+        self.round_trips += 1
+        available = self.simulator.available_upgrades()
+        return [str(upgrade.price) if (upgrade := self._upgrade(html_id, available)) else None for html_id in html_ids]
+
+    async def buy_building(self, id: int) -> None:
+        self.round_trips += 1
+        self.simulator.buy_building(id)
+        self._changed()
+
+    async def buy_upgrade(self, html_id: str) -> None:
+        self.round_trips += 1
+        upgrade = self._upgrade(html_id, self.simulator.available_upgrades())
+        if upgrade is not None:
+            self.simulator.buy_upgrade(upgrade.name)
+        self._changed()
+
+    async def start_clicking(self, target_cps: float) -> None:
+        self.round_trips += 1
+        self.simulator.clicks_per_second = min(target_cps, MAX_CPS)  # like click_engine.js
+
+    async def stop_clicking(self) -> None:
+        self.round_trips += 1
+        self.simulator.clicks_per_second = 0
+
+    async def read_click_counts(self) -> RawClickCounts:
+        self.round_trips += 1
+        return {"dispatched": self.simulator.clicks, "accepted": str(int(self.simulator.clicks))}
+
+    async def collect_shimmers(self) -> None:
+        self.round_trips += 1
+        if self.simulator.golden_cookie_on_screen:
+            self.simulator.collect_golden_cookie()
+            self._changed()
+
+    async def watch_shimmers(self, callback: t.Callable[[dict[str, str]], None]) -> None:
+        self.round_trips += 2
+        self._on_shimmer = callback
+        self.simulator.auto_collect_golden_cookies = True
+
+    async def read_health(self) -> dict[str, float]:
+        self.round_trips += 1
+        return {}
+
+    async def read_latest_save(self) -> str | None:
+        self.round_trips += 1
+        return self.simulator.save()
+
+    async def close(self) -> None:
+        pass
+
+    async def restart(self, save: str | None) -> t.Self:
+        backend = type(self)(Simulator() if save is None else Simulator.load(save))
+        backend.round_trips = self.round_trips
+        return backend
+
+    def _upgrade(self, html_id: str, available: tuple[UpgradeInfo, ...]) -> UpgradeInfo | None:
+        index = int(html_id.removeprefix("upgrade"))
+        return available[index] if index < len(available) else None
+
+    def _changed(self) -> None:
+        """Tell subscribers what has changed, like ``state_stream.js`` and ``shimmer_observer.js`` do."""
+        if self._on_shimmer is not None:
+            for _ in range(self.simulator.golden_cookies_collected - self._collected):
+                self._on_shimmer({"className": "shimmer"})
+        self._collected = self.simulator.golden_cookies_collected
+
+        if self._stream is not None:
+            snapshot = self.simulator.snapshot()
+            delta = t.cast(
+                RawState, {key: value for key, value in snapshot.items() if self._last_pushed.get(key) != value}
+            )
+            self._last_pushed = snapshot
+            if delta:
+                self._stream(delta)
@@ -0,0 +1,342 @@
+import asyncio
+import json
+import pathlib
+import time
+import typing as t
+from contextlib import asynccontextmanager
+
+import aiohttp
+from loguru import logger
+from playwright.async_api import Browser, CDPSession, Page, async_playwright
+
+from src.backend import RawClickCounts
+from src.backend.routing import GAME_URL, GameRouter
+from src.metrics import Metrics
+from src.scheduler import wait_for_event
+from src.state import RawState
+from src.supervisor import TaskSupervisor
+from src.utils import read_js
+
+AD_SELECTORS = (
+    "#google_esf",  # root google ad stuff
+    "#smallSupport,.ifNoAds",  # ads upper upgrades
+    "#support,#detectAds",  # under buildings
+    "body > *:not(#wrapper)",  # other ads in body tag
+)
+
+HEALTH_METRICS = {
+    "JSHeapUsedSize": "renderer_heap_used_bytes",
+    "JSHeapTotalSize": "renderer_heap_total_bytes",
+    "Nodes": "renderer_dom_nodes",
+    "JSEventListeners": "renderer_event_listeners",
+    "Documents": "renderer_documents",
+}
+"""Chrome's performance metrics, that show leaks in the page. Chrome's name -> our name."""
+
+SAVE_KEY = "CookieClickerGame"
+"""Where the game keeps its save in ``localStorage``."""
+
+
+class PlaywrightBackend:
+    """Plays the real game in a browser."""
+
+    def __init__(
+        self,
+        browser: Browser,
+        page: Page,
+        preset: pathlib.Path | None = None,
+        seeded: bool = False,
+        mirror: pathlib.Path | None = None,
+        leased: bool = False,
+    ) -> None:
+        self.browser = browser
+        self.page = page
+        self.mirror = mirror
+        self.preset = preset
+        """Save of an already configured game. If it doesn't exist yet, we create it in :meth:`prepare`."""
+        self.seeded = seeded
+        """Whether the game is already configured, e.g. it has booted from :attr:`preset` (or a checkpoint)."""
+        self.leased = leased
+        """Whether the game is leased from a daemon (see :meth:`attach`). Then the daemon owns it, not us."""
+        self.round_trips = 0
+
+        self._cdp: CDPSession | None = None
+        self._on_state: t.Callable[[RawState], None] | None = None
+        self._pushed = 0
+        """Number of the last delta, that the page has pushed."""
+        self._synced = asyncio.Event()
+        self._sync_to = 0
+
+    @classmethod
+    @asynccontextmanager
+    async def launch(
+        cls,
+        headless: bool = False,
+        mirror: pathlib.Path | None = None,
+        preset: pathlib.Path | None = None,
+        save: str | None = None,
+    ) -> t.AsyncIterator[t.Self]:
+        """Open the game in a new browser.
+
+        Args:
+            headless: Don't show the browser window.
+            mirror: Serve the game from this directory, downloading only files that are missing there.
+            preset: Boot the game from this save, so it is already configured. See :attr:`preset`.
+            save: Boot the game from this save instead, e.g. to continue from a checkpoint.
+        """
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=headless, args=["--start-maximized"])
+            backend = await cls.open(browser, mirror=mirror, preset=preset, save=save)
+
+            logger.info("Executing our steps...")
+            yield backend
+
+            await browser.close()
+
+    @classmethod
+    async def open(
+        cls,
+        browser: Browser,
+        mirror: pathlib.Path | None = None,
+        preset: pathlib.Path | None = None,
+        save: str | None = None,
+    ) -> t.Self:
+        """Open the game in a new context of ``browser``, which doesn't share anything with other contexts.
+
+        See :meth:`launch` for arguments.
+        """
+        start = time.perf_counter()
+        context = await browser.new_context()
+        page = await context.new_page()
+        router = GameRouter(mirror)
+        await page.route("**/*", router.handle)
+        await page.add_init_script("localStorage.setItem('CookieClickerLang', 'EN');")  # set language
+        if save is None and preset is not None and preset.is_file():
+            save = preset.read_text()
+        if save is not None:
+            await cls.seed(page, save)
+
+        logger.info("Navigating to page...")
+        await page.goto(GAME_URL, wait_until="commit")
+        logger.info("Waiting for the game to load...")
+        await (await page.wait_for_function(read_js("ready.js"), polling="raf")).dispose()
+        logger.info(
+            "Game is ready in {:.2f}s ({} files from mirror, {} from network, {} blocked)",
+            time.perf_counter() - start,
+            router.from_mirror,
+            router.from_network,
+            router.blocked,
+        )
+        version = await page.text_content("#versionNumber")
+        if version is None or "2.052" not in version:
+            logger.warning(f"Expected game version 2.052, but the page says {version!r}")
+
+        return cls(browser, page, preset, seeded=save is not None, mirror=mirror)
+
+    @classmethod
+    @asynccontextmanager
+    async def attach(cls, daemon: str, metrics: Metrics | None = None) -> t.AsyncIterator[t.Self]:
+        """Lease an already loaded game from a browser daemon (see :mod:`src.daemon`), and release it after.
+
+        Args:
+            daemon: URL of the daemon, e.g. ``http://127.0.0.1:9300``.
+            metrics: Where health of renewing the lease goes, see :class:`.TaskSupervisor`.
+        """
+        async with aiohttp.ClientSession(daemon) as session:
+            async with session.post("/lease") as response:
+                response.raise_for_status()
+                lease = await response.json()
+
+            async def renew() -> None:
+                async with session.post(f"/renew/{lease['id']}") as response:
+                    response.raise_for_status()
+
+            supervisor = TaskSupervisor(metrics)
+            supervisor.every("renew_lease", lease["ttl"] / 3, renew, delay_first=True)
+            try:
+                async with async_playwright() as p:
+                    browser = await p.chromium.connect_over_cdp(lease["cdp"])
+                    pages = [page for context in browser.contexts for page in context.pages]
+                    page = next((page for page in pages if page.url.endswith(f"#{lease['id']}")), None)
+                    if page is None:
+                        raise LookupError(f"Daemon has leased us game {lease['id']}, but there is no such page")
+                    logger.info(f"Leased a game from {daemon}")
+                    yield cls(browser, page, seeded=lease["seeded"], leased=True)
+            finally:
+                await supervisor.shutdown()
+                async with session.post(f"/release/{lease['id']}") as response:
+                    if response.status != 404:  # the lease has expired, the game is already released
+                        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self.page.context.close()
+
+    async def restart(self, save: str | None) -> t.Self:
+        """Throw this game away, even if it has crashed or hung, and boot a fresh one in the same browser.
+
+        Args:
+            save: Continue from this save. If ``None``, start over.
+        """
+        if self.leased:
+            raise RuntimeError("A game leased from the daemon can't be restarted, the daemon owns the browser")
+        try:
+            await asyncio.wait_for(self.close(), 10)
+        except Exception as e:
+            logger.warning(f"Could not close the old game: {e!r}")
+        backend = await type(self).open(self.browser, mirror=self.mirror, preset=self.preset, save=save)
+        backend.round_trips = self.round_trips  # so it is still a total, e.g. for round trips per tick
+        return backend
+
+    def clock(self) -> float:
+        return time.monotonic()
+
+    async def wait(self, seconds: float, wake: asyncio.Event) -> None:
+        await wait_for_event(seconds, wake)
+
+    @staticmethod
+    async def seed(page: Page, save: str) -> None:
+        """Make the game load ``save`` when it boots in a fresh tab. Must be called before navigating."""
+        await page.add_init_script(f"({read_js('seed.js')})({json.dumps(save)})")
+
+    async def prepare(self) -> None:
+        if self.seeded:
+            logger.info("Game is already configured, removing ads and opening stats page...")
+            await self.page.evaluate(read_js("finish_setup.js"), ", ".join(AD_SELECTORS))
+            return
+
+        await self.remove_ads()
+        await self.set_settings()
+        await self.open_stats_page()
+        await self.rename_bakery()
+        if self.preset is not None:
+            await self.save_preset(self.preset)
+
+    async def read_save(self) -> str:
+        """Make the game save itself now, and return the save."""
+        await self.page.evaluate(f"localStorage.removeItem({SAVE_KEY!r})")
+        await self.page.keyboard.press("Control+S")
+        # if the shortcut didn't work, the game still saves itself once a minute
+        handle = await self.page.wait_for_function(f"localStorage.getItem({SAVE_KEY!r})", timeout=90_000)
+        try:
+            return t.cast(str, await handle.json_value())
+        finally:
+            await handle.dispose()
+
+    async def read_latest_save(self) -> str | None:
+        """Make the game save itself soon, and return what it has saved the last time, without waiting.
+
+        So if called periodically, it returns a save that is one period old at most.
+        """
+        self.round_trips += 2
+        await self.page.keyboard.press("Control+S")
+        return t.cast(str | None, await self.page.evaluate(f"localStorage.getItem({SAVE_KEY!r})"))
+
+    async def save_preset(self, path: pathlib.Path) -> None:
+        logger.info(f"Saving configured game to {path}...")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(await self.read_save())
+
+    async def remove_ads(self) -> None:
+        logger.info("Removing ads...")
+        selector = ", ".join(AD_SELECTORS)
+        await self.page.evaluate(f"for (const el of document.querySelectorAll('{selector}')) el.remove();")
+
+    async def set_settings(self) -> None:
+        logger.info("Setting settings...")
+        await self.page.click("#prefsButton > .subButton")
+        await self.page.fill("#volumeSlider", "0")
+        await self.page.click("#fancyButton")
+        await self.page.click("#particlesButton")
+        await self.page.click("#numbersButton")
+        await self.page.click("#milkButton")
+        await self.page.click("#wobblyButton")
+        await self.page.click("#monospaceButton")
+        await self.page.click("#formatButton")
+        await self.page.click("#notifsButton")
+        await self.page.click("#prefsButton > .subButton")
+
+    async def open_stats_page(self) -> None:
+        logger.info("Opening stats page...")
+        await self.page.click("#statsButton")
+
+    async def rename_bakery(self) -> None:
+        logger.info("Renaming bakery...")
+        await self.page.click("#bakeryName")
+        await self.page.fill("#bakeryNameInput", "Perchun's TAS")
+        await self.page.click("#promptOption0")
+
+    async def read_state(self) -> RawState:
+        self.round_trips += 1
+        return t.cast(RawState, await self.page.evaluate(read_js("snapshot.js")))
+
+    async def stream_state(self, callback: t.Callable[[RawState], None], interval: float) -> None:
+        self.round_trips += 2
+        if self._on_state is None:
+            await self.page.expose_function("tasPushState", self._on_push)
+        self._on_state, self._pushed = callback, 0
+        await self.page.evaluate(
+            f"(interval) => ({read_js('state_stream.js')})({read_js('snapshot.js')}, interval)", interval * 1000
+        )
+
+    async def sync_state(self) -> None:
+        self.round_trips += 1
+        self._synced.clear()
+        self._sync_to = t.cast(int, await self.page.evaluate("window.tasSyncState()"))
+        if self._pushed < self._sync_to:
+            await asyncio.wait_for(self._synced.wait(), 10)
+
+    def _on_push(self, delta: RawState, seq: int) -> None:
+        self._pushed = seq
+        if delta and self._on_state is not None:
+            self._on_state(delta)
+        if seq >= self._sync_to:
+            self._synced.set()
+
+    async def read_building_production(self, ids: list[int]) -> list[str | None]:
+        self.round_trips += 1
+        return t.cast(list[str | None], await self.page.evaluate(read_js("building_tooltips.js"), ids))
+
+    async def read_upgrade_prices(self, html_ids: list[str]) -> list[str | None]:
+        self.round_trips += 1
+        return t.cast(list[str | None], await self.page.evaluate(read_js("upgrade_tooltips.js"), html_ids))
+
+    async def buy_building(self, id: int) -> None:
+        self.round_trips += 1
+        await self.page.click(f"#product{id}")
+
+    async def buy_upgrade(self, html_id: str) -> None:
+        self.round_trips += 1
+        await self.page.click(f"#{html_id}")
+
+    async def start_clicking(self, target_cps: float) -> None:
+        self.round_trips += 1
+        await self.page.evaluate(read_js("click_engine.js"), target_cps)
+
+    async def stop_clicking(self) -> None:
+        self.round_trips += 1
+        await self.page.evaluate("if (window.tasClicker !== undefined) clearInterval(window.tasClicker.timer);")
+
+    async def read_click_counts(self) -> RawClickCounts:
+        self.round_trips += 1
+        return t.cast(RawClickCounts, await self.page.evaluate(read_js("click_stats.js")))
+
+    async def collect_shimmers(self) -> None:
+        self.round_trips += 1
+        await self.page.evaluate("for (const el of document.querySelectorAll('#shimmers > .shimmer')) el.click();")
+
+    async def watch_shimmers(self, callback: t.Callable[[dict[str, str]], None]) -> None:
+        self.round_trips += 2
+        await self.page.expose_function("tasOnShimmer", callback)
+        await self.page.evaluate(read_js("shimmer_observer.js"))
+
+    async def read_health(self) -> dict[str, float]:
+        self.round_trips += 1
+        if self._cdp is None:
+            self._cdp = await self.page.context.new_cdp_session(self.page)
+            await self._cdp.send("Performance.enable")
+        result = await self._cdp.send("Performance.getMetrics")
+        return {
+            HEALTH_METRICS[metric["name"]]: metric["value"]
+            for metric in result["metrics"]
+            if metric["name"] in HEALTH_METRICS
+        }
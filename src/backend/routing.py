@@ -0,0 +1,73 @@
+"""Decides what the browser is allowed to download, and serves the game from a local mirror.
+
+Everything except the game itself (ads, analytics, fonts, audio) is blocked before it is fetched.
+With a mirror, files of the game are downloaded only once, and after that we don't need network at all.
+"""
+import pathlib
+import urllib.parse
+
+from loguru import logger
+from playwright.async_api import Route
+
+from src.utils import write_atomically
+
+GAME_URL = "https://orteil.dashnet.org/cookieclicker/"
+
+BLOCKED_RESOURCE_TYPES = frozenset({"font", "media"})
+"""Resource types, that the game works without. Media is its music and sounds."""
+
+BLOCKED_PATHS = ("patreon/", "server.php")
+"""Parts of the game, that only talk to Orteil's servers (heralds, news), and are useless for us."""
+
+
+def is_allowed(url: str, resource_type: str) -> bool:
+    if not url.startswith(GAME_URL) or resource_type in BLOCKED_RESOURCE_TYPES:
+        return False
+    return not url.removeprefix(GAME_URL).startswith(BLOCKED_PATHS)
+
+
+def mirror_path(mirror: pathlib.Path, url: str) -> pathlib.Path | None:
+    """Where ``url`` of the game is stored in the mirror. ``None`` if it can't be stored there."""
+    path = urllib.parse.urlsplit(url.removeprefix(GAME_URL)).path or "index.html"
+    if path.endswith("/"):
+        path += "index.html"
+
+    file = (mirror / path).resolve()
+    if not file.is_relative_to(mirror.resolve()):
+        return None
+    return file
+
+
+class GameRouter:
+    """Handler for ``page.route``, which blocks everything but the game, and mirrors the game if ``mirror`` is set."""
+
+    def __init__(self, mirror: pathlib.Path | None = None) -> None:
+        self.mirror = mirror
+        self.blocked = 0
+        self.from_mirror = 0
+        self.from_network = 0
+
+    async def handle(self, route: Route) -> None:
+        request = route.request
+        if not is_allowed(request.url, request.resource_type):
+            self.blocked += 1
+            await route.abort("blockedbyclient")
+            return
+
+        file = mirror_path(self.mirror, request.url) if self.mirror is not None else None
+        if file is None:
+            self.from_network += 1
+            await route.continue_()
+            return
+        if file.is_file():
+            self.from_mirror += 1
+            await route.fulfill(path=file)
+            return
+
+        self.from_network += 1
+        response = await route.fetch()
+        if response.ok:
+            logger.debug(f"Saving {request.url} to the mirror")
+            # other contexts may be reading the mirror at the same time
+            write_atomically(file, await response.body())
+        await route.fulfill(response=response)
@@ -0,0 +1,104 @@
+"""Benchmark suite: plays several games and compares their metrics with a stored baseline.
+
+By default it plays the simulator, which is deterministic (except for timings of our own code), so
+milestones and round trips per tick only change when the strategy does. With ``--browser`` it plays the
+real game, served from a local mirror. Each metric is the median over all runs, and a metric regresses
+when it gets worse than the baseline by more than ``--tolerance``.
+"""
+import asyncio
+import json
+import pathlib
+import statistics
+import sys
+
+import typer
+from loguru import logger
+
+import src.logging
+from src import utils
+from src.harness import RunResult, play_in_browser, simulate_many
+
+HIGHER_IS_BETTER = frozenset({"clicks_per_second", "accepted_clicks_per_second"})
+"""For all other metrics (times, round trips, durations) lower is better."""
+
+MIN_DURATION_CHANGE_MS = 0.025
+"""Durations change by this much just because of noise (timer resolution, other processes). Changes bigger than
+that are judged relative to the baseline, as phases of a tick usually take well under a millisecond."""
+
+COMPARED = ("phase.", "milestone.", "round_trips_per_tick", "clicks_per_second", "accepted_clicks_per_second")
+"""Prefixes of metrics, that can regress. Others (e.g. number of ticks or purchases) are only stored."""
+NOT_COMPARED = (".p90_ms", ".max_ms")
+"""Suffixes of metrics, that are only stored. Tail latencies come from a few slow ticks, so they are mostly noise."""
+
+
+def aggregate(results: list[RunResult]) -> dict[str, float]:
+    """Median of each metric over all runs, that have it."""
+    names = sorted({name for result in results for name in result.metrics})
+    return {
+        name: statistics.median(result.metrics[name] for result in results if name in result.metrics) for name in names
+    }
+
+
+def regressions(
+    current: dict[str, float], baseline: dict[str, float], tolerance: float
+) -> dict[str, tuple[float, float]]:
+    """Metrics, that got worse than ``baseline`` by more than ``tolerance`` (relative). Name -> (baseline, now)."""
+    result: dict[str, tuple[float, float]] = {}
+    for name, expected in baseline.items():
+        if not name.startswith(COMPARED) or name.endswith(NOT_COMPARED):
+            continue
+        actual = current.get(name)
+        if actual is None:  # e.g. a milestone wasn't reached
+            result[name] = (expected, float("nan"))
+            continue
+        if name in HIGHER_IS_BETTER:
+            worse = actual < expected * (1 - tolerance)
+        elif name.endswith("_ms"):
+            worse = actual - expected > max(expected * tolerance, MIN_DURATION_CHANGE_MS)
+        else:
+            worse = actual > expected * (1 + tolerance)
+        if worse:
+            result[name] = (expected, actual)
+    return result
+
+
+@utils.async_to_sync
+async def main(
+    runs: int = 10,
+    target: float = 1_000_000,
+    target_cps: float = 50,
+    browser: bool = False,  # play the real game instead of the simulator
+    workers: int | None = None,
+    mirror: pathlib.Path | None = None,  # the local copy of the game, see `--mirror` of the main script
+    preset: pathlib.Path | None = None,
+    baseline: pathlib.Path | None = None,  # compare with this file
+    save: pathlib.Path | None = None,  # write results as a new baseline
+    tolerance: float = 0.2,
+    logging_level: src.logging.LoggingLevel = "warning",  # type: ignore[assignment] # typer magic
+) -> None:
+    src.logging.setup_logging(logging_level)
+
+    if browser:
+        results = await play_in_browser(runs, target, target_cps, workers or 4, mirror=mirror, preset=preset)
+    else:
+        results = await asyncio.to_thread(simulate_many, runs, target, target_cps, workers)
+    current = aggregate(results)
+
+    for name, value in current.items():
+        print(f"{name:<45} {value:>12.3f}")
+    if save is not None:
+        save.parent.mkdir(parents=True, exist_ok=True)
+        save.write_text(json.dumps(current, indent=2, sort_keys=True) + "\n")
+        logger.success(f"Saved baseline to {save}")
+
+    if baseline is not None:
+        worse = regressions(current, json.loads(baseline.read_text()), tolerance)
+        for name, (expected, actual) in worse.items():
+            logger.error(f"{name} regressed: {expected:.3f} -> {actual:.3f}")
+        if worse:
+            sys.exit(1)
+        logger.success(f"No regressions compared to {baseline}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,12 +1,16 @@
 import dataclasses
+import math
 import typing as t
 
-from playwright.async_api import Page
+from src.backend import GameBackend
+from src.number_format import parse_number
+from src.state import ProductState
 
-from src.utils import extract_number_from_string
+PRICE_GROWTH = 1.15
+"""Each bought building makes the next one 15% more expensive."""
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Building:
     id: int
     produces: float | None
@@ -17,18 +21,66 @@ class Building:
         return "product" + str(self.id)
 
     @classmethod
-    async def create(cls, page: Page, html_id: str) -> t.Self:
-        int_id = int(html_id.removeprefix("product"))
+    async def read_all(cls, backend: GameBackend, products: list[ProductState]) -> list[t.Self]:
+        """Read production of all given buildings in one call, without moving the mouse."""
+        produces = await backend.read_building_production([product.id for product in products])
 
-        await (await page.query_selector("#" + html_id)).hover()  # type: ignore[union-attr] # can be None, but not in runtime
-        produces = await page.query_selector("#tooltipBuilding > .descriptionBlock > b")
+        return [
+            cls(
+                id=product.id,
+                produces=parse_number(text) if text is not None else None,
+                costs=product.price,
+            )
+            for product, text in zip(products, produces, strict=True)
+        ]
 
-        price = await page.query_selector(f"#productPrice{int_id}")
-        if price is None:
-            raise ValueError(f"Could not find price for building {int_id}")
 
-        return cls(
-            id=int_id,
-            produces=extract_number_from_string(await produces.inner_text()) if produces is not None else None,
-            costs=extract_number_from_string(await price.inner_text()),
-        )
+class BuildingRegistry:
+    """Buildings that live between ticks.
+
+    Price of a building changes only when we buy it, so we predict it instead of reading. Buildings
+    are read from the page again only if the store has changed, or our prediction went wrong.
+    """
+
+    PRICE_TOLERANCE = 0.01
+    """How much (relatively) can predicted price differ from the shown one."""
+
+    def __init__(self) -> None:
+        self._buildings: dict[int, Building] = {}
+        self._owned: dict[int, int] = {}
+        self._dirty = True
+
+    @property
+    def buildings(self) -> list[Building]:
+        return list(self._buildings.values())
+
+    def needs_revalidation(self, products: list[ProductState]) -> bool:
+        if self._dirty or len(products) != len(self._buildings):
+            return True
+
+        for product in products:
+            building = self._buildings.get(product.id)
+            if building is None or self._owned[product.id] != product.owned:
+                return True
+            if abs(building.costs - product.price) > building.costs * self.PRICE_TOLERANCE:
+                return True
+        return False
+
+    async def sync(self, backend: GameBackend, products: list[ProductState]) -> list[Building]:
+        if self.needs_revalidation(products):
+            self._buildings = {building.id: building for building in await Building.read_all(backend, products)}
+            self._owned = {product.id: product.owned for product in products}
+            self._dirty = False
+        return self.buildings
+
+    def record_purchase(self, building: Building) -> None:
+        building.costs = math.ceil(building.costs * PRICE_GROWTH)
+        self._owned[building.id] += 1
+
+        # we know how much a building produces only after we buy it for the first time
+        if building.produces is None:
+            self._dirty = True
+
+    def invalidate(self) -> None:
+        """Force re-reading buildings on the next sync, e.g. after an upgrade changed their production."""
+        self._dirty = True
@@ -0,0 +1,34 @@
+"""Checkpoints of the game's save, so a run can continue after the page crashes or hangs, instead of starting over.
+
+The save is what the game itself keeps in ``localStorage``, so restoring it is just booting a fresh page
+from it (see :meth:`.PlaywrightBackend.restart`). On disk it's compressed with zlib, and written only
+when it has changed.
+"""
+import hashlib
+import pathlib
+import zlib
+
+from src.utils import write_atomically
+
+
+class Checkpoints:
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+
+        self._last_digest: bytes | None = None
+
+    def write(self, save: str) -> bool:
+        """Write ``save``, if it's not the same as the last one. Returns whether it was written."""
+        data = save.encode()
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == self._last_digest:
+            return False
+        write_atomically(self.path, zlib.compress(data))
+        self._last_digest = digest
+        return True
+
+    def read(self) -> str | None:
+        """The last checkpoint, or ``None`` if there is none yet."""
+        if not self.path.is_file():
+            return None
+        return zlib.decompress(self.path.read_bytes()).decode()
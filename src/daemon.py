@@ -0,0 +1,223 @@
+"""Browser daemon, that keeps games loaded and ready, so a run doesn't wait for the browser and the game to boot.
+
+The daemon launches one browser with remote debugging and keeps ``--size`` games loaded in it, each
+in its own context. A run leases one (see :meth:`.PlaywrightBackend.attach`), connects to the browser
+over CDP and finds the page by its lease ID in the URL fragment. A leased game is never reused, when
+it's released, its context is closed, and a new game has already been loading since the lease.
+
+``POST /lease`` waits until a game is ready and returns ``{"id", "cdp", "seeded", "ttl"}``, or 503, if
+no game got ready in time. A lease, that isn't renewed with ``POST /renew/{id}`` for ``ttl`` seconds
+(e.g. its run has crashed), is released. ``POST /release/{id}`` gives it back, and ``GET /status``
+shows how many games are ready and leased.
+"""
+import asyncio
+import pathlib
+import time
+import typing as t
+import uuid
+
+import typer
+from aiohttp import web
+from loguru import logger
+from playwright.async_api import Browser, async_playwright
+
+import src.logging
+from src import utils
+from src.backend.playwright import PlaywrightBackend
+from src.supervisor import TaskSupervisor
+
+LOAD_RETRY_DELAY = 1
+"""How long (in seconds) to wait before loading a game again, after it failed. Doubles after every failure in a row."""
+MAX_LOAD_RETRY_DELAY = 60
+LEASE_TIMEOUT = 60
+"""How long (in seconds) ``POST /lease`` waits for a ready game."""
+EXPIRE_INTERVAL = 10
+"""How often (in seconds) to look for expired leases."""
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        browser: Browser,
+        cdp: str,
+        size: int = 2,
+        mirror: pathlib.Path | None = None,
+        preset: pathlib.Path | None = None,
+        lease_ttl: float = 600,
+        clock: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.browser = browser
+        self.cdp = cdp
+        """Where clients connect to :attr:`browser`."""
+        self.size = size
+        self.mirror = mirror
+        self.preset = preset
+        self.lease_ttl = lease_ttl
+        """A lease, that isn't renewed for that long (in seconds), is released."""
+        self.clock = clock
+
+        self._ready: asyncio.Queue[tuple[str, PlaywrightBackend]] = asyncio.Queue()
+        self._leased: dict[str, tuple[PlaywrightBackend, float]] = {}
+        """ID -> (game, when the lease expires)."""
+        self._background: set[asyncio.Task[None]] = set()
+        self._supervisor = TaskSupervisor()
+
+    @property
+    def ready(self) -> int:
+        return self._ready.qsize()
+
+    @property
+    def leased(self) -> int:
+        return len(self._leased)
+
+    async def start(self) -> None:
+        if self.preset is not None and not self.preset.is_file():
+            logger.info("Creating the preset first, so every game boots already configured...")
+            backend = await PlaywrightBackend.open(self.browser, mirror=self.mirror, preset=self.preset)
+            await backend.prepare()
+            await backend.close()
+        for _ in range(self.size):
+            self._in_background(self._load(), "load")
+        self._supervisor.every("expire_leases", EXPIRE_INTERVAL, self.expire, delay_first=True)
+
+    async def lease(self) -> tuple[str, PlaywrightBackend]:
+        """Wait for a ready game, and start loading its replacement."""
+        id, backend = await self._ready.get()
+        self._leased[id] = backend, self.clock() + self.lease_ttl
+        self._in_background(self._load(), "load")
+        logger.info(f"Leased game {id} ({self.ready} ready, {self.leased} leased)")
+        return id, backend
+
+    def renew(self, id: str) -> None:
+        """Keep a leased game for :attr:`lease_ttl` more seconds. Raises :class:`KeyError`, if it isn't leased."""
+        backend, _ = self._leased[id]
+        self._leased[id] = backend, self.clock() + self.lease_ttl
+
+    def release(self, id: str) -> None:
+        """Throw away a leased game. Raises :class:`KeyError`, if it isn't leased."""
+        backend, _ = self._leased.pop(id)
+        self._in_background(backend.close(), f"close {id}")
+        logger.info(f"Released game {id}")
+
+    async def expire(self) -> None:
+        """Release every lease, that wasn't renewed in time."""
+        now = self.clock()
+        for id in [id for id, (_, expires) in self._leased.items() if expires <= now]:
+            logger.warning(f"Lease of game {id} has expired")
+            self.release(id)
+
+    async def stop(self) -> None:
+        await self._supervisor.shutdown()
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+
+    async def _load(self) -> None:
+        """Load a game, retrying with backoff until it works, so the pool doesn't shrink."""
+        delay = LOAD_RETRY_DELAY
+        while True:
+            try:
+                backend = await PlaywrightBackend.open(self.browser, mirror=self.mirror, preset=self.preset)
+                if not backend.seeded:
+                    # without a preset, configure every game here, so clients get the same game as with `launch`
+                    await backend.prepare()
+                    backend.seeded = True
+                id = uuid.uuid4().hex
+                await backend.page.evaluate("(id) => history.replaceState(null, '', '#' + id)", id)
+            except Exception as e:
+                logger.opt(exception=e).error(f"Could not load a game for the pool, retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_LOAD_RETRY_DELAY)
+                continue
+            self._ready.put_nowait((id, backend))
+            return
+
+    def _in_background(self, coroutine: t.Coroutine[object, None, None], name: str) -> None:
+        task = asyncio.create_task(coroutine, name=name)
+        self._background.add(task)
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task[None]) -> None:
+        self._background.discard(task)
+        # e.g. closing a game, that has already crashed
+        if not task.cancelled() and (error := task.exception()) is not None:
+            logger.warning(f"Background task {task.get_name()!r} of the pool has failed: {error!r}")
+
+
+class PoolServer:
+    def __init__(self, pool: BrowserPool, host: str = "127.0.0.1", port: int = 9300) -> None:
+        self.pool = pool
+        self.host = host
+        self.port = port
+
+        self.app = web.Application()
+        self.app.router.add_post("/lease", self._lease)
+        self.app.router.add_post("/renew/{id}", self._renew)
+        self.app.router.add_post("/release/{id}", self._release)
+        self.app.router.add_get("/status", self._status)
+        self._runner = web.AppRunner(self.app, access_log=None)
+
+    async def start(self) -> None:
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Serving games on http://{self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        await self._runner.cleanup()
+
+    async def _lease(self, request: web.Request) -> web.Response:
+        try:
+            id, backend = await asyncio.wait_for(self.pool.lease(), LEASE_TIMEOUT)
+        except TimeoutError:
+            raise web.HTTPServiceUnavailable(text="No game got ready in time")
+        return web.json_response({"id": id, "cdp": self.pool.cdp, "seeded": backend.seeded, "ttl": self.pool.lease_ttl})
+
+    async def _renew(self, request: web.Request) -> web.Response:
+        try:
+            self.pool.renew(request.match_info["id"])
+        except KeyError:
+            raise web.HTTPNotFound()
+        return web.Response(status=204)
+
+    async def _release(self, request: web.Request) -> web.Response:
+        try:
+            self.pool.release(request.match_info["id"])
+        except KeyError:
+            raise web.HTTPNotFound()
+        return web.Response(status=204)
+
+    async def _status(self, request: web.Request) -> web.Response:
+        return web.json_response({"ready": self.pool.ready, "leased": self.pool.leased})
+
+
+@utils.async_to_sync
+async def main(
+    size: int = 2,  # games to keep ready
+    port: int = 9300,
+    cdp_port: int = 9222,  # where clients connect to the browser
+    headless: bool = True,
+    mirror: pathlib.Path | None = None,
+    preset: pathlib.Path | None = None,
+    lease_ttl: float = 600,  # release a game, if its lease isn't renewed for that long (e.g. the run has crashed)
+    logging_level: src.logging.LoggingLevel = "info",  # type: ignore[assignment] # typer magic
+) -> None:
+    src.logging.setup_logging(logging_level)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless, args=[f"--remote-debugging-port={cdp_port}"])
+        pool = BrowserPool(
+            browser, f"http://127.0.0.1:{cdp_port}", size, mirror=mirror, preset=preset, lease_ttl=lease_ttl
+        )
+        await pool.start()
+        server = PoolServer(pool, port=port)
+        await server.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+            await pool.stop()
+            await browser.close()
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,159 @@
+"""Runs many games at once, to see how long it takes to reach a milestone, and how much it varies.
+
+One run tells us almost nothing, because of golden cookies and timing, so strategies should be compared
+by distributions. Simulated runs are spread across a process pool (they are pure CPU work); browser
+runs share one browser, each in its own context, under one event loop.
+"""
+import asyncio
+import concurrent.futures
+import dataclasses
+import pathlib
+import statistics
+import typing as t
+
+import typer
+from loguru import logger
+from playwright.async_api import Browser, async_playwright
+
+import src.logging
+from src import utils
+from src.backend.memory import InMemoryBackend
+from src.backend.playwright import PlaywrightBackend
+from src.logic.all import AllLogic
+from src.metrics import Metrics
+from src.simulator import Simulator
+from src.utils import percentile
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class RunResult:
+    seed: int
+    seconds: float
+    """How long it took to reach the milestone, in game time."""
+    golden_cookies: int
+    metrics: dict[str, float] = dataclasses.field(default_factory=dict, compare=False)
+    """See :meth:`.Metrics.snapshot`."""
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class Distribution:
+    runs: int
+    median: float
+    p90: float
+    worst: float
+
+    @classmethod
+    def of(cls, results: t.Sequence[RunResult]) -> t.Self:
+        seconds = sorted(result.seconds for result in results)
+        return cls(
+            runs=len(seconds),
+            median=statistics.median(seconds),
+            p90=percentile(seconds, 90),
+            worst=seconds[-1],
+        )
+
+    def __str__(self) -> str:
+        return f"{self.runs} runs: median {self.median:.1f}s, p90 {self.p90:.1f}s, worst {self.worst:.1f}s"
+
+
+async def play(logic: AllLogic, target: float, target_cps: float) -> RunResult:
+    """Drive ``logic`` from the start until the milestone."""
+    start = logic.backend.clock()
+    try:
+        await logic.setup(target_cps, golden_cookie_observer=True)
+        start = logic.backend.clock()
+        await logic.run(target)
+    finally:
+        await logic.stop()
+    return RunResult(
+        seed=0,
+        seconds=logic.backend.clock() - start,
+        golden_cookies=logic.golden_cookies_caught,
+        metrics=logic.metrics.snapshot(),
+    )
+
+
+def simulate(seed: int, target: float, target_cps: float) -> RunResult:
+    """One simulated run. Module-level function, so it can be sent to another process."""
+    result = asyncio.run(play(AllLogic(InMemoryBackend(Simulator(seed))), target, target_cps))
+    return dataclasses.replace(result, seed=seed)
+
+
+def simulate_many(
+    runs: int, target: float, target_cps: float, workers: int | None = None, first_seed: int = 0
+) -> list[RunResult]:
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(simulate, seed, target, target_cps) for seed in range(first_seed, first_seed + runs)]
+        return [future.result() for future in futures]
+
+
+async def play_in_browser(
+    runs: int,
+    target: float,
+    target_cps: float,
+    concurrency: int,
+    mirror: pathlib.Path | None = None,
+    preset: pathlib.Path | None = None,
+    daemon: str | None = None,
+) -> list[RunResult]:
+    """Play ``runs`` games in one headless browser, at most ``concurrency`` of them at once.
+
+    With ``daemon``, games are leased from a browser daemon instead, so runs don't wait for the game to load.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(seed: int, browser: Browser | None) -> RunResult:
+        async with semaphore:
+            if browser is None:
+                metrics = Metrics()
+                async with PlaywrightBackend.attach(t.cast(str, daemon), metrics) as backend:
+                    result = await play(AllLogic(backend, metrics), target, target_cps)
+            else:
+                backend = await PlaywrightBackend.open(browser, mirror=mirror, preset=preset)
+                try:
+                    result = await play(AllLogic(backend), target, target_cps)
+                finally:
+                    await backend.close()
+        logger.info(f"Run {seed} reached the milestone in {result.seconds:.1f}s")
+        return dataclasses.replace(result, seed=seed)
+
+    if daemon is not None:
+        return list(await asyncio.gather(*(one(seed, None) for seed in range(runs))))
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            results = await asyncio.gather(*(one(seed, browser) for seed in range(runs)))
+        finally:
+            await browser.close()
+    return list(results)
+
+
+@utils.async_to_sync
+async def main(
+    runs: int = 20,
+    target: float = 1_000_000,
+    target_cps: float = 50,
+    browser: bool = False,  # play the real game instead of the simulator
+    workers: int | None = None,  # processes for the simulator, or games at once in the browser
+    mirror: pathlib.Path | None = None,
+    preset: pathlib.Path | None = None,
+    daemon: str | None = None,  # lease games from this browser daemon, instead of launching a browser
+    logging_level: src.logging.LoggingLevel = "warning",  # type: ignore[assignment] # typer magic
+) -> None:
+    src.logging.setup_logging(logging_level)
+
+    if browser:
+        results = await play_in_browser(
+            runs, target, target_cps, workers or 4, mirror=mirror, preset=preset, daemon=daemon
+        )
+    else:
+        results = await asyncio.to_thread(simulate_many, runs, target, target_cps, workers)
+
+    for result in sorted(results, key=lambda result: result.seconds):
+        logger.debug(f"Seed {result.seed}: {result.seconds:.1f}s, {result.golden_cookies} golden cookies")
+    print(f"Time to {target:,.0f} cookies: {Distribution.of(results)}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
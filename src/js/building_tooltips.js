@@ -0,0 +1,12 @@
+(ids) => {
+  // Instead of moving the real mouse, we fire the same events that the store listens to. The tooltip
+  // is drawn synchronously from the `mouseover` handler, so we can read it right away.
+  return ids.map((id) => {
+    const product = document.getElementById("product" + id);
+    product.dispatchEvent(new MouseEvent("mouseover", { bubbles: true }));
+    const produces = document.querySelector("#tooltipBuilding > .descriptionBlock > b");
+    const text = produces === null ? null : produces.textContent;
+    product.dispatchEvent(new MouseEvent("mouseout", { bubbles: true }));
+    return text;
+  });
+}
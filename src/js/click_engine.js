@@ -0,0 +1,23 @@
+(targetCps) => {
+  if (window.tasClicker !== undefined) {
+    clearInterval(window.tasClicker.timer);
+  }
+
+  // v2.052 ignores a click, that comes sooner than that after the previous one
+  const minInterval = 1000 / 50;
+  const cookie = document.getElementById("bigCookie");
+  const clicker = { clicks: 0, last: -Infinity, timer: 0 };
+  clicker.timer = setInterval(
+    () => {
+      // timers are not precise, so never click in bursts to catch up, every click after the first would be lost
+      const now = performance.now();
+      if (now - clicker.last < minInterval) return;
+      clicker.last = now;
+      // `detail: 1` makes it look like a real click, the game throttles `el.click()` much more
+      cookie.dispatchEvent(new MouseEvent("click", { bubbles: true, detail: 1 }));
+      clicker.clicks++;
+    },
+    Math.max(1000 / targetCps, minInterval),
+  );
+  window.tasClicker = clicker;
+}
@@ -0,0 +1,12 @@
+() => {
+  // "Cookie clicks" on the stats page are clicks, that the game has actually counted
+  let accepted = null;
+  for (const listing of document.querySelectorAll("#menu .listing")) {
+    const title = listing.querySelector("b");
+    if (title !== null && title.textContent.startsWith("Cookie clicks")) {
+      accepted = listing.textContent.slice(title.textContent.length);
+      break;
+    }
+  }
+  return { dispatched: window.tasClicker === undefined ? 0 : window.tasClicker.clicks, accepted: accepted };
+}
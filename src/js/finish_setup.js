@@ -0,0 +1,4 @@
+(adsSelector) => {
+  for (const el of document.querySelectorAll(adsSelector)) el.remove();
+  document.getElementById("statsButton").click();
+}
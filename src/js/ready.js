@@ -0,0 +1,5 @@
+() => {
+  // the store is drawn only after the game has fully initialized
+  const price = document.getElementById("productPrice0");
+  return price !== null && price.textContent !== "";
+}
@@ -0,0 +1,19 @@
+(save) => {
+  // runs before every navigation, but we want to seed only a fresh tab, not to reset a reloaded one
+  if (sessionStorage.getItem("tasSeeded") !== null) return;
+  sessionStorage.setItem("tasSeeded", "1");
+
+  // the save remembers when it was made, so make it look like the run has just started
+  try {
+    const encoded = unescape(save).replace("!END!", "");
+    const parts = decodeURIComponent(escape(atob(encoded))).split("|");
+    const run = parts[2].split(";");
+    const now = String(Date.now());
+    run[0] = run[1] = run[2] = now; // start date, full date, last date
+    parts[2] = run.join(";");
+    save = escape(btoa(unescape(encodeURIComponent(parts.join("|")))) + "!END!");
+  } catch (e) {
+    console.error("Could not refresh dates in the preset save", e);
+  }
+  localStorage.setItem("CookieClickerGame", save);
+}
@@ -0,0 +1,26 @@
+() => {
+  if (window.tasShimmerObserver !== undefined) {
+    return;
+  }
+
+  const pop = (shimmer) => {
+    shimmer.dispatchEvent(new MouseEvent("click", { bubbles: true, detail: 1 }));
+    window.tasOnShimmer({ className: shimmer.className });
+  };
+
+  const shimmers = document.getElementById("shimmers");
+  window.tasShimmerObserver = new MutationObserver((mutations) => {
+    for (const mutation of mutations) {
+      for (const node of mutation.addedNodes) {
+        if (node instanceof HTMLElement && node.classList.contains("shimmer")) {
+          pop(node);
+        }
+      }
+    }
+  });
+  window.tasShimmerObserver.observe(shimmers, { childList: true });
+
+  for (const shimmer of shimmers.querySelectorAll(".shimmer")) {
+    pop(shimmer);
+  }
+}
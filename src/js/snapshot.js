@@ -0,0 +1,37 @@
+() => {
+  const text = (id) => {
+    const el = document.getElementById(id);
+    return el === null ? "" : el.textContent;
+  };
+  const perSecond = document.getElementById("cookiesPerSecond");
+  // "1.500 million cookies", with "per second: ..." inside, which is not a part of the balance
+  let balance = "";
+  for (const node of document.getElementById("cookies").childNodes) {
+    if (node !== perSecond) balance += node.textContent;
+  }
+
+  // the store is rebuilt from scratch every time an upgrade gets unlocked or bought, so
+  // counting those rebuilds is enough to know whether cached prices are still valid
+  if (window.tasUpgradesVersion === undefined) {
+    window.tasUpgradesVersion = Date.now();
+    new MutationObserver(() => window.tasUpgradesVersion++).observe(document.getElementById("upgrades"), {
+      childList: true,
+    });
+  }
+
+  return {
+    balance,
+    cps: perSecond === null ? "0" : perSecond.textContent.split(":").pop(),
+    products: Array.from(document.querySelectorAll("#products > .product.unlocked"), (el) => {
+      const id = el.id.slice("product".length);
+      return { id: Number(id), price: text("productPrice" + id), owned: text("productOwned" + id) };
+    }),
+    // HTML IDs are just positions in the store, so we also send something that identifies the upgrade itself
+    upgrades: Array.from(document.querySelectorAll("#upgrades > .upgrade"), (el) => ({
+      htmlId: el.id,
+      key: el.getAttribute("onclick") || el.getAttribute("style"),
+    })),
+    upgradesVersion: window.tasUpgradesVersion,
+    shimmers: document.querySelectorAll("#shimmers > .shimmer").length,
+  };
+}
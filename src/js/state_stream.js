@@ -0,0 +1,46 @@
+(snapshot, interval) => {
+  if (window.tasStateStream !== undefined) {
+    window.tasStateStream.disconnect();
+  }
+
+  const sent = {};
+  let scheduled = false;
+  let seq = 0;
+  // numbers every delta, so Python knows when it has everything up to a `tasSyncState()`
+  const flush = (always) => {
+    scheduled = false;
+    const delta = {};
+    let changed = false;
+    for (const [key, value] of Object.entries(snapshot())) {
+      const serialized = JSON.stringify(value);
+      if (sent[key] !== serialized) {
+        sent[key] = serialized;
+        delta[key] = value;
+        changed = true;
+      }
+    }
+    if (changed || always) {
+      seq += 1;
+      window.tasPushState(delta, seq);
+    }
+    return seq;
+  };
+  window.tasSyncState = () => flush(true);
+
+  // the game redraws some of these every frame, so we send at most one delta per `interval`
+  window.tasStateStream = new MutationObserver(() => {
+    if (!scheduled) {
+      scheduled = true;
+      setTimeout(() => flush(false), interval);
+    }
+  });
+  for (const id of ["cookies", "products", "upgrades", "shimmers"]) {
+    window.tasStateStream.observe(document.getElementById(id), {
+      subtree: true,
+      childList: true,
+      characterData: true,
+      attributes: true,
+    });
+  }
+  flush(false);
+}
@@ -0,0 +1,11 @@
+(htmlIds) => {
+  // see `building_tooltips.js`
+  return htmlIds.map((htmlId) => {
+    const upgrade = document.getElementById(htmlId);
+    upgrade.dispatchEvent(new MouseEvent("mouseover", { bubbles: true }));
+    const price = document.querySelector("#tooltipCrate > div > span.price");
+    const text = price === null ? null : price.textContent;
+    upgrade.dispatchEvent(new MouseEvent("mouseout", { bubbles: true }));
+    return text;
+  });
+}
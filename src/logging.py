@@ -1,8 +1,22 @@
+"""Logging, that is cheap enough to stay on in the main loop.
+
+Sinks write from a background thread (``enqueue=True``), so the event loop never waits for the terminal.
+Messages from one line of code are sampled (see :class:`Sampler`), so a loop that logs on every tick
+or an error that repeats can't flood the output. Full tracebacks with values of variables are shown
+only for the first occurrence of each error (see :class:`FirstOccurrence`).
+"""
 import enum
+import json
+import pathlib
 import sys
+import time
+import typing as t
 
 from loguru import logger
 
+if t.TYPE_CHECKING:
+    from loguru import Record
+
 
 class LoggingLevel(enum.Enum):
     """Enum for logging levels."""
@@ -27,24 +41,132 @@ class LoggingLevel(enum.Enum):
         }[self]
 
 
-def setup_logging(logging_level: LoggingLevel) -> None:
-    """Setup logging for the addon."""
+class Sampler:
+    """Let through at most ``burst`` messages from one line of code per ``period`` seconds.
+
+    The first message after a pause says how many were dropped. One sampler can be shared by several
+    sinks, the decision is made once per message.
+    """
+
+    def __init__(self, burst: int = 5, period: float = 1, clock: t.Callable[[], float] = time.monotonic) -> None:
+        self.burst = burst
+        self.period = period
+        self.clock = clock
+
+        self._windows: dict[tuple[str | None, int], tuple[float, int, int]] = {}
+        """Line of code -> (start of the window, messages in it, messages dropped)."""
+
+    def __call__(self, record: "Record") -> bool:
+        decision = record["extra"].get("sampled")
+        if decision is None:
+            decision = record["extra"]["sampled"] = self._decide(record)
+        return t.cast(bool, decision)
+
+    def _decide(self, record: "Record") -> bool:
+        key = (record["file"].path, record["line"])
+        now = self.clock()
+        start, count, dropped = self._windows.get(key, (now, 0, 0))
+        if now - start >= self.period:
+            start, count = now, 0
+        if count >= self.burst:
+            self._windows[key] = start, count, dropped + 1
+            return False
+
+        if dropped:
+            record["message"] += f" ({dropped} similar messages dropped)"
+        self._windows[key] = start, count + 1, 0
+        return True
+
+
+class FirstOccurrence:
+    """Whether a message carries an error, that we haven't seen yet (same type, raised from the same line)."""
+
+    def __init__(self) -> None:
+        self._seen: set[tuple[str, str, int]] = set()
+
+    def __call__(self, record: "Record") -> bool:
+        decision = record["extra"].get("first_occurrence")
+        if decision is None:
+            decision = record["extra"]["first_occurrence"] = self._decide(record)
+        return t.cast(bool, decision)
+
+    def _decide(self, record: "Record") -> bool:
+        exception = record["exception"]
+        if exception is None or exception.type is None:
+            return False
+        traceback = exception.traceback
+        if traceback is None:
+            key = (exception.type.__qualname__, "", 0)
+        else:
+            while traceback.tb_next is not None:
+                traceback = traceback.tb_next
+            key = (exception.type.__qualname__, traceback.tb_frame.f_code.co_filename, traceback.tb_lineno)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+
+def compact_json(record: "Record") -> str:
+    """Format for the file sink: one short JSON object per line."""
+    entry: dict[str, str | float] = {
+        "time": record["time"].timestamp(),
+        "level": record["level"].name,
+        "where": f"{record['name']}:{record['line']}",
+        "message": record["message"],
+    }
+    if record["exception"] is not None and record["exception"].type is not None:
+        entry["exception"] = repr(record["exception"].value)
+    record["extra"]["json"] = json.dumps(entry)
+    return "{extra[json]}\n"
+
+
+def setup_logging(logging_level: LoggingLevel, log_file: pathlib.Path | None = None) -> None:
+    """Setup logging for the addon.
+
+    Args:
+        log_file: Also write everything there, as JSON lines.
+    """
     logger.remove()
-    if logging_level.to_int() < LoggingLevel.WARNING.to_int():
+    level = logging_level.to_int()
+    warning = LoggingLevel.WARNING.to_int()
+    sampler = Sampler()
+    first_occurrence = FirstOccurrence()
+
+    if level < warning:
         logger.add(
             sys.stdout,
-            level=logging_level.to_int(),
-            filter=lambda record: record["level"].no < LoggingLevel.WARNING.to_int(),
+            level=level,
+            filter=lambda record: record["level"].no < warning and sampler(record),
             colorize=True,
-            backtrace=True,
-            diagnose=True,
+            enqueue=True,
         )
     logger.add(
         sys.stderr,
-        level=logging_level.to_int(),
-        filter=lambda record: record["level"].no >= LoggingLevel.WARNING.to_int(),
+        level=level,
+        filter=lambda record: record["level"].no >= warning and first_occurrence(record),
         colorize=True,
         backtrace=True,
         diagnose=True,
+        enqueue=True,
     )
+    logger.add(
+        sys.stderr,
+        level=level,
+        filter=lambda record: record["level"].no >= warning and not first_occurrence(record) and sampler(record),
+        colorize=True,
+        backtrace=False,
+        diagnose=False,
+        enqueue=True,
+    )
+    if log_file is not None:
+        logger.add(
+            log_file,
+            level=level,
+            filter=sampler,
+            format=compact_json,
+            backtrace=False,
+            diagnose=False,
+            enqueue=True,
+        )
     logger.debug("Logging was setup!")
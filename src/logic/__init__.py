@@ -1,33 +1,101 @@
 import abc
+import pathlib
 import typing as t
 from contextlib import asynccontextmanager
 
 from loguru import logger
-from playwright.async_api import Browser, Page, async_playwright
+
+from src.backend import GameBackend
+from src.backend.playwright import PlaywrightBackend
+from src.building import BuildingRegistry
+from src.metrics import Metrics
+from src.route import Kind, RouteRecorder, RouteStep
+from src.state import GameState, StateCache
+from src.upgrade import UpgradeIndex
 
 
 class AbstractLogicExtension(abc.ABC):
-    def __init__(self, browser: Browser, page: Page) -> None:
-        self.browser = browser
-        self.page = page
+    def __init__(self, backend: GameBackend, metrics: Metrics | None = None) -> None:
+        self.backend = backend
+
+        self.cache = StateCache(backend.clock)
+        self.buildings = BuildingRegistry()
+        self.upgrades = UpgradeIndex()
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.recorder: RouteRecorder | None = None
+        """Records every purchase, if set."""
+        self.balance: float = 0
+        self.next_purchase_price: float | None = None
+        """Price of the thing we want to buy next, so we know how long we can wait."""
+
+        self._streaming_state = False
+        self._purchased = False
+        """Whether we have bought something since the state was updated the last time."""
+
+    @property
+    def state(self) -> GameState:
+        return self.cache.state
+
+    @property
+    def produced_per_last_second(self) -> float:
+        return self.cache.production.rate
+
+    def _elapsed(self) -> float:
+        """Seconds since the start of the run, as routes count them."""
+        now = self.backend.clock()
+        return now - (self.metrics.started if self.metrics.started is not None else now)
 
-        self.balance = 0
-        self.old_balance = 0
-        self.produced_per_last_second = 0
+    def _record(self, kind: Kind, target: int | str, price: float) -> None:
+        """Note a purchase, that was just made, and add it to the route, if we record one."""
+        self._purchased = True
+        if self.recorder is None:
+            return
+        cps = self.produced_per_last_second or self.state.cps
+        self.recorder.record(RouteStep(self._elapsed(), kind, target, price, balance=self.balance, cps=cps))
 
     @classmethod
     @asynccontextmanager
-    async def init(cls) -> t.AsyncIterator[t.Self]:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=False, args=["--start-maximized"])
-            page = await browser.new_page()
-            logger.info("Navigating to page...")
-            await page.goto("https://orteil.dashnet.org/cookieclicker/", wait_until="domcontentloaded")
-            await page.evaluate("window.localStorageSet('CookieClickerLang', 'EN');")  # set language
-            logger.info("Waiting for page to load...")
-            await page.wait_for_load_state("networkidle")
-
-            logger.info("Executing our steps...")
-            yield cls(browser, page)
-
-            await browser.close()
+    async def init(
+        cls,
+        headless: bool = False,
+        mirror: pathlib.Path | None = None,
+        preset: pathlib.Path | None = None,
+        daemon: str | None = None,
+        save: str | None = None,
+    ) -> t.AsyncIterator[t.Self]:
+        """Play the real game in a browser, see :meth:`.PlaywrightBackend.launch`.
+
+        If ``daemon`` is set, lease an already loaded game from it instead (see :meth:`.PlaywrightBackend.attach`),
+        other arguments are then up to the daemon. Such a game has already booted, so it can't start from ``save``.
+        """
+        if daemon is not None:
+            if save is not None:
+                raise ValueError("A game leased from the daemon has already booted, it can't continue from a save")
+            metrics = Metrics()
+            async with PlaywrightBackend.attach(daemon, metrics) as backend:
+                yield cls(backend, metrics)
+            return
+        async with PlaywrightBackend.launch(headless=headless, mirror=mirror, preset=preset, save=save) as backend:
+            yield cls(backend)
+
+    async def update_state(self) -> None:
+        """Read the whole game state at once, all other logic should only read from :attr:`state`.
+
+        If the page already pushes the state to us (see :meth:`stream_state`), this only makes sure, that
+        it has pushed results of our last purchases. Otherwise we would see the balance before them, and
+        buy the same thing again.
+        """
+        if not self._streaming_state:
+            self.cache.apply(await self.backend.read_state())
+        elif self._purchased:
+            await self.backend.sync_state()
+        self._purchased = False
+
+    async def stream_state(self, interval: float = 0.1) -> None:
+        """Make the page push changes of the state to us, as soon as they happen.
+
+        Changes are sent not more often than once per ``interval`` seconds.
+        """
+        logger.info("Subscribing to state changes...")
+        await self.backend.stream_state(self.cache.apply, interval)
+        self._streaming_state = True
@@ -1,74 +1,302 @@
-import asyncio
+import time
 
 from loguru import logger
 
-from src.logic.buy_buildings import BuyBuildingsLogic
-from src.logic.buy_upgrades import BuyUpgradesLogic
-from src.utils import extract_number_from_string
-
-
-class AllLogic(BuyBuildingsLogic, BuyUpgradesLogic):
-    async def remove_ads(self) -> None:
-        logger.info("Removing ads...")
-        elements_to_block = [
-            "#google_esf",  # root google ad stuff
-            "#smallSupport,.ifNoAds",  # ads upper upgrades
-            "#support,#detectAds",  # under buildings
-            "body > *:not(#wrapper)",  # other ads in body tag
-        ]
-        await self.page.evaluate(
-            f"for (const el of document.querySelectorAll('{", ".join(elements_to_block)}')) el.remove();"
-        )
+from src import utils
+from src.backend import GameBackend
+from src.building import Building
+from src.checkpoint import Checkpoints
+from src.clicker import ClickEngine, ClickStats
+from src.logic.purchases import PurchasesLogic
+from src.metrics import Metrics
+from src.route import Kind, RouteStep
+from src.scheduler import TickScheduler
+from src.state import RawState
+from src.supervisor import TaskSupervisor
+from src.telemetry import TelemetryRing
+from src.upgrade import Upgrade
+
+CLICK_STATS_INTERVAL = 10
+"""How often (in seconds) to report achieved clicks per second."""
+HEALTH_INTERVAL = 60
+"""How often (in seconds) to check memory usage."""
+CHECKPOINT_INTERVAL = 10
+"""How often (in seconds) to checkpoint the save. That much progress is lost, if the game crashes."""
+STALL_TIMEOUT = 30
+"""If the balance doesn't change for that long (in seconds), the game has hung."""
+MAX_RECOVERIES = 3
+"""How many times in a row we try to continue from a checkpoint, before giving up."""
+REPLAY_STEP_TIMEOUT = 60
+"""How long (in seconds) to wait for a step of a replayed route to appear in the store, before it is skipped."""
+
+
+class AllLogic(PurchasesLogic):
+    def __init__(self, backend: GameBackend, metrics: Metrics | None = None) -> None:
+        super().__init__(backend, metrics)
+
+        self.golden_cookies_caught = 0
+        self._watching_golden_cookies = False
+        self._upgrades_version: float | None = None
+        self._shimmers = 0
+        self.clicker = ClickEngine(backend)
+        self._clicking = False
+        self.supervisor = TaskSupervisor(self.metrics)
+        """Owns everything, that runs in the background."""
+        self.telemetry: TelemetryRing | None = None
+        """Per-tick history of the run, if set."""
+        self.checkpoints: Checkpoints | None = None
+        """Where to checkpoint the save, if set. See :meth:`start_checkpoints`."""
+        self._setup_args: tuple[float, bool, bool] | None = None
+        self._progress: tuple[float, float] | None = None
+        """When the balance has changed the last time, and to what."""
+        self._hung = False
+
+        self.scheduler = TickScheduler(wait=backend.wait)
+        self.cache.listeners.append(self._on_state_change)
+
+    async def setup(self, target_cps: float, golden_cookie_observer: bool = False, push_state: bool = True) -> None:
+        """Everything that should be done before :meth:`run`."""
+        self._setup_args = target_cps, golden_cookie_observer, push_state
+        await self.backend.prepare()
+        if push_state:
+            await self.stream_state()
+        else:
+            self.scheduler.max_delay = 1  # nobody will wake us up, so don't miss golden cookies
+        await self.click_cookie_in_the_background(target_cps)
+        if golden_cookie_observer:
+            await self.watch_golden_cookies()
+        self.supervisor.every("health", HEALTH_INTERVAL, self.check_health)
+
+    async def sample_clicks(self) -> None:
+        stats = await self.clicker.sample()
+        if stats is not None:
+            logger.debug(
+                "Clicking at {:.1f} CPS (game counted {})",
+                stats.dispatched_cps,
+                "unknown" if stats.accepted_cps is None else f"{stats.accepted_cps:.1f}",
+            )
+            self._record_clicks(stats)
+
+    def _record_clicks(self, stats: ClickStats) -> None:
+        self.metrics.gauges["clicks_per_second"] = stats.dispatched_cps
+        if stats.accepted_cps is not None:
+            self.metrics.gauges["accepted_clicks_per_second"] = stats.accepted_cps
+
+    async def click_cookie_in_the_background(self, target_cps: float) -> None:
+        logger.info(f"Starting clicking cookie in the background at {target_cps} clicks per second...")
+        self.clicker.target_cps = target_cps
+        await self.clicker.start()
+        self._clicking = True
+        self.supervisor.every("click_stats", CLICK_STATS_INTERVAL, self.sample_clicks, delay_first=True)
+
+    async def check_health(self) -> None:
+        """Put memory usage of the page and of us into metrics, so leaks are visible on long runs."""
+        health = await self.backend.read_health()
+        rss = utils.rss_bytes()
+        if rss is not None:
+            health["python_rss_bytes"] = rss
+        self.metrics.gauges.update(health)
+        logger.debug("Health: {}", ", ".join(f"{name}={value:,.0f}" for name, value in health.items()))
+
+    def start_checkpoints(self, checkpoints: Checkpoints) -> None:
+        """Checkpoint the save periodically, and restart the game if it hangs.
+
+        :meth:`run` then continues from the last checkpoint, if the game crashes or hangs.
+        """
+        self.checkpoints = checkpoints
+        self._progress = None
+        self.supervisor.every("checkpoint", CHECKPOINT_INTERVAL, self.checkpoint)
+        self.supervisor.every("watchdog", STALL_TIMEOUT / 3, self.watchdog, delay_first=True)
+
+    async def checkpoint(self) -> None:
+        assert self.checkpoints is not None, "checkpoint() before start_checkpoints()"
+        save = await self.backend.read_latest_save()
+        if save is not None and self.checkpoints.write(save):
+            self.metrics.count("checkpoints")
+
+    async def watchdog(self) -> None:
+        """If the game has hung, close it, so :meth:`run` notices and continues from the last checkpoint."""
+        if self._progress is None:
+            return
+        stalled_for = self.backend.clock() - self._progress[0]
+        if stalled_for > STALL_TIMEOUT:
+            logger.error(f"Balance hasn't changed for {stalled_for:.0f}s, the game has hung, closing it...")
+            self._progress = None
+            self._hung = True
+            # if the main loop waits for the page, this makes it fail instead of waiting forever
+            await self.backend.close()
+
+    async def recover(self) -> None:
+        """Continue from the last checkpoint in a fresh game, after the old one has crashed or hung."""
+        checkpoints = self.checkpoints
+        assert checkpoints is not None, "recover() before start_checkpoints()"
+        assert self._setup_args is not None, "recover() before setup()"
+        await self.supervisor.shutdown()  # everything in background still uses the old game
+        self._clicking = False
+        self._hung = False
+
+        save = checkpoints.read()
+        if save is None:
+            logger.warning("There is no checkpoint yet, starting over")
+        self.backend = await self.backend.restart(save)
+        self.clicker.backend = self.backend
+        self.scheduler.wait = self.backend.wait
+        self.metrics.count("recoveries")
+        await self.setup(*self._setup_args)
+        self.start_checkpoints(checkpoints)
+        logger.success("Continuing from the last checkpoint")
 
-    async def set_settings(self) -> None:
-        logger.info("Setting settings...")
-        await self.page.click("#prefsButton > .subButton")
-        await self.page.fill("#volumeSlider", "0")
-        await self.page.click("#fancyButton")
-        await self.page.click("#particlesButton")
-        await self.page.click("#numbersButton")
-        await self.page.click("#milkButton")
-        await self.page.click("#wobblyButton")
-        await self.page.click("#monospaceButton")
-        await self.page.click("#formatButton")
-        await self.page.click("#notifsButton")
-        await self.page.click("#prefsButton > .subButton")
-
-    async def open_stats_page(self) -> None:
-        logger.info("Opening stats page...")
-        await self.page.click("#statsButton")
-
-    async def rename_bakery(self) -> None:
-        logger.info("Renaming bakery...")
-        await self.page.click("#bakeryName")
-        await self.page.fill("#bakeryNameInput", "Perchun's TAS")
-        await self.page.click("#promptOption0")
-
-    async def click_cookie_loop(self) -> None:
-        while True:
+    async def stop(self) -> None:
+        """Stop everything, that runs in the background."""
+        await self.supervisor.shutdown()
+        if self._clicking:
+            self._clicking = False
+            stats = await self.clicker.sample()
+            if stats is not None:
+                self._record_clicks(stats)
+            await self.clicker.stop()
+
+    def update_balance(self) -> None:
+        self.balance = self.state.balance
+
+    async def collect_golden_cookies(self) -> None:
+        if self.state.shimmers and not self._watching_golden_cookies:
+            await self.backend.collect_shimmers()
+            self.golden_cookies_caught += self.state.shimmers
+            self.metrics.count("golden_cookies_caught", self.state.shimmers)
+
+    async def watch_golden_cookies(self) -> None:
+        """Click golden cookies from inside the page, as soon as they appear.
+
+        After this, :meth:`collect_golden_cookies` does nothing.
+        """
+        logger.info("Watching for golden cookies...")
+        await self.backend.watch_shimmers(self._on_golden_cookie)
+        self._watching_golden_cookies = True
+
+    def _on_golden_cookie(self, shimmer: dict[str, str]) -> None:
+        self.golden_cookies_caught += 1
+        # the observer clicks them before the state shows them, so it is the only one who sees them
+        self.metrics.count("golden_cookies_seen")
+        self.metrics.count("golden_cookies_caught")
+        logger.info(f"Caught golden cookie ({shimmer['className']}), {self.golden_cookies_caught} in total")
+        self.scheduler.wake()  # it might have given us a lot of cookies
+
+    def _on_state_change(self, delta: RawState) -> None:
+        # full snapshots always contain the version, so check that it has really changed
+        upgrades_changed = "upgradesVersion" in delta and delta["upgradesVersion"] != self._upgrades_version
+        self._upgrades_version = self.state.upgrades_version
+        if self.state.shimmers > self._shimmers and not self._watching_golden_cookies:
+            self.metrics.count("golden_cookies_seen", self.state.shimmers - self._shimmers)
+        self._shimmers = self.state.shimmers
+        if delta.get("shimmers") or upgrades_changed:
+            self.scheduler.wake()
+
+    async def wait_for_next_tick(self) -> None:
+        rate = self.produced_per_last_second or self.state.cps
+        await self.scheduler.sleep(self.scheduler.delay(self.balance, rate, self.next_purchase_price))
+
+    async def _observe(self) -> None:
+        """Everything we do at the start of a tick, before deciding what to buy."""
+        with self.metrics.phase("update_state"):
+            await self.update_state()
+        with self.metrics.phase("update_balance"):
+            self.update_balance()
+        if self._progress is None or self._progress[1] != self.balance:
+            self._progress = self.backend.clock(), self.balance
+        self.metrics.reach(self.balance, self.backend.clock())
+        self.metrics.gauges["balance"] = self.balance
+        self.metrics.gauges["cps"] = self.state.cps
+        with self.metrics.phase("collect_golden_cookies"):
+            await self.collect_golden_cookies()
+
+    async def run(self, target: float = 1_000_000) -> None:
+        """Play until the balance is over ``target``.
+
+        With :attr:`checkpoints`, if the game crashes or hangs, continue from the last checkpoint in a fresh game.
+        """
+        failures = 0
+        while self.balance <= target:
             try:
-                await self.page.click("#bigCookie")
+                await self._tick()
             except Exception as e:
-                logger.exception(e)
+                failures += 1
+                if self.checkpoints is None or failures > MAX_RECOVERIES:
+                    raise
+                logger.opt(exception=e).error("The game has failed, restarting it...")
+                await self.recover()
             else:
-                await asyncio.sleep(0.0001)
+                failures = 0
+
+    async def _tick(self) -> None:
+        if self._hung:
+            raise RuntimeError("The game has hung")
+        start = time.perf_counter()
+        await self._observe()
+        with self.metrics.phase("make_purchases"):
+            await self.make_purchases()
+        self.metrics.tick(self.backend.round_trips)
+        if self.telemetry is not None:
+            self._write_telemetry(self.telemetry, time.perf_counter() - start)
+        logger.trace("Cycle done, balance is: {}", self.balance)
+        await self.wait_for_next_tick()
 
-    async def click_cookie_in_the_background(self) -> None:
-        logger.info("Starting clicking cookie in the background...")
-        asyncio.create_task(self.click_cookie_loop())
+    def _write_telemetry(self, telemetry: TelemetryRing, latency: float) -> None:
+        telemetry.write(
+            time=self.backend.clock(),
+            balance=self.balance,
+            cps=self.state.cps,
+            clicks=self.clicker.clicks,
+            buildings=sum(product.owned for product in self.state.products),
+            latency=latency,
+        )
+
+    async def replay(self, route: list[RouteStep]) -> None:
+        """Make purchases from ``route`` in order, without any planning.
 
-    async def update_balance(self) -> None:
-        element = await self.page.query_selector("#cookies > span.monospace")
-        assert element is not None
-        self.balance = int(extract_number_from_string(await element.inner_text()))
+        Each one is made as soon as we can afford it, but not earlier than in the recorded run, so the
+        replay has the same timing.
+        """
+        logger.info(f"Replaying a route of {len(route)} purchases...")
+        await self._observe()
+        for step in route:
+            deadline = self.backend.clock() + REPLAY_STEP_TIMEOUT
+            while True:
+                target = await self._find_in_store(step)
+                if target is None and self.backend.clock() > deadline:
+                    break
+                if target is not None and self._price(target) <= self.balance:
+                    early = step.at - self._elapsed()
+                    if early <= 0:
+                        break
+                    self.metrics.tick(self.backend.round_trips)
+                    await self.scheduler.sleep(min(early, self.scheduler.max_delay))
+                else:
+                    self.next_purchase_price = step.price if target is None else self._price(target)
+                    self.metrics.tick(self.backend.round_trips)
+                    await self.wait_for_next_tick()
+                await self._observe()
 
-        produced_per_last_second = self.balance - self.old_balance
-        if produced_per_last_second > 0:  # if we bought something, this might be negative
-            self.produced_per_last_second = produced_per_last_second
+            if target is None:
+                logger.warning(
+                    f"Skipping {step.kind.name.lower()} {step.target} of the route,"
+                    f" it hasn't appeared in the store for {REPLAY_STEP_TIMEOUT} seconds"
+                )
+            elif isinstance(target, Building):
+                await self._buy_building(target)
+            else:
+                await self._buy_upgrade(target)
+                # the store is rebuilt, so wait until we know new HTML IDs of upgrades
+                self.next_purchase_price = None
+                await self.wait_for_next_tick()
+                await self._observe()
+        logger.success("Route is done!")
 
-        self.old_balance = self.balance
+    async def _find_in_store(self, step: RouteStep) -> Building | Upgrade | None:
+        if step.kind is Kind.BUILDING:
+            return next((b for b in await self._get_buyable_buildings() if b.id == step.target), None)
+        return next((u for u in await self._get_buyable_upgrades() if u.key == step.target), None)
 
-    async def collect_golden_cookies(self) -> None:
-        cookies = await self.page.query_selector_all("#shimmers > .shimmer")
-        for cookie in cookies:
-            await cookie.click()
+    @staticmethod
+    def _price(target: Building | Upgrade) -> float:
+        return target.costs if isinstance(target, Building) else target.price
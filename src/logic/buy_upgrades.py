@@ -1,24 +1,21 @@
 from loguru import logger
 
 from src.logic import AbstractLogicExtension
-from src.utils import extract_number_from_string
+from src.route import Kind
+from src.upgrade import Upgrade
 
 
 class BuyUpgradesLogic(AbstractLogicExtension):
-    async def buy_upgrades(self) -> None:
-        upgrade_elements = await self.page.query_selector_all("#upgrades > *.upgrade.enabled")
-        for upgrade in upgrade_elements:
-            upgrade_id = await upgrade.get_attribute("id")
-            assert upgrade_id is not None
+    async def _get_buyable_upgrades(self) -> list[Upgrade]:
+        await self.upgrades.sync(self.backend, self.state.upgrades, self.state.upgrades_version)
+        return self.upgrades.by_price()
 
-            await self.page.locator("#" + upgrade_id).hover()
-            price_as_element = await self.page.query_selector("#tooltipCrate > div > span.price")
-
-            if price_as_element is None:
-                logger.error(f"Could not find price for upgrade {upgrade_id}")
-                continue
-
-            price = extract_number_from_string(await price_as_element.inner_text())
-            if price <= self.balance:
-                logger.info(f"Buying upgrade {upgrade_id} for {price} cookies")
-                await self.page.click(f"#{upgrade_id}")
+    async def _buy_upgrade(self, upgrade: Upgrade) -> None:
+        logger.info(f"Buying upgrade {upgrade.html_id} for {upgrade.price} cookies")
+        with self.metrics.phase("buy_upgrades"):
+            await self.backend.buy_upgrade(upgrade.html_id)
+        self._record(Kind.UPGRADE, upgrade.key, upgrade.price)
+        self.balance -= upgrade.price
+        self.upgrades.remove(upgrade)
+        self.buildings.invalidate()
+        self.metrics.count("upgrades_bought")
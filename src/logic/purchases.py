@@ -0,0 +1,35 @@
+import asyncio
+
+from src import planner
+from src.building import Building
+from src.logic.buy_buildings import BuyBuildingsLogic
+from src.logic.buy_upgrades import BuyUpgradesLogic
+
+
+class PurchasesLogic(BuyBuildingsLogic, BuyUpgradesLogic):
+    async def make_purchases(self) -> None:
+        with self.metrics.phase("sync_store"):
+            buildings = await self._get_buyable_buildings()
+            upgrades = await self._get_buyable_upgrades()
+
+        with self.metrics.phase("plan"):
+            # planning is pure CPU work, so we do it in a thread, to not delay anything else in the event loop
+            plan = await asyncio.to_thread(
+                planner.plan, buildings, upgrades, self.balance, self.produced_per_last_second or self.state.cps
+            )
+        self.next_purchase_price = plan[0].price if plan else None
+
+        for step in plan:
+            if step.price > self.balance:
+                self.next_purchase_price = step.price
+                break
+
+            if isinstance(step.target, Building):
+                await self._buy_building(step.target)
+            else:
+                # buying an upgrade rebuilds the store, so HTML IDs of other upgrades are not valid anymore
+                await self._buy_upgrade(step.target)
+                self.next_purchase_price = None
+                break
+        else:
+            self.next_purchase_price = None
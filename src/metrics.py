@@ -0,0 +1,141 @@
+"""Numbers about how well we play: how long each phase of a tick takes, how often we talk to the game, etc.
+
+Everything is kept in memory and is cheap to record, so metrics are always on. :meth:`Metrics.snapshot`
+flattens them into ``name -> number``, which is what benchmarks store as baselines, and
+:meth:`Metrics.to_prometheus` renders them for the metrics endpoint (see :mod:`src.metrics_server`).
+"""
+import bisect
+import collections
+import contextlib
+import time
+import typing as t
+
+from src.state import RateWindow
+from src.utils import percentile
+
+MILESTONES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000, 1_000_000_000)
+"""Balances, for which we record how long it took to reach them."""
+
+
+PROMETHEUS_PREFIX = "cookieclicker_"
+
+
+class PhaseStats:
+    """Durations of one phase. Percentiles are computed from the most recent :attr:`RECENT` durations."""
+
+    RECENT = 1024
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+    """Upper bounds (in seconds) of histogram buckets."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: collections.deque[float] = collections.deque(maxlen=self.RECENT)
+        self.buckets = [0] * (len(self.BUCKETS) + 1)
+        """Not cumulative, the last one is for everything above the last bound."""
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+        self.buckets[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    @property
+    def p90(self) -> float:
+        return percentile(sorted(self.recent), 90) if self.recent else 0
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.phases: dict[str, PhaseStats] = collections.defaultdict(PhaseStats)
+        self.gauges: dict[str, float] = {}
+        self.counters: dict[str, int] = collections.defaultdict(int)
+        self.ticks = 0
+        self.round_trips = 0
+        """Round trips to the game, as of the last tick."""
+        self.round_trip_rate = RateWindow()
+        self.milestones: dict[int, float] = {}
+        """Milestone -> seconds since :attr:`started`, when it was reached."""
+        self.started: float | None = None
+
+        self._phase_stack: list[str] = []
+
+    @property
+    def current_phase(self) -> str | None:
+        """The innermost phase, that is running right now."""
+        return self._phase_stack[-1] if self._phase_stack else None
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> t.Iterator[None]:
+        """Measure how long the block takes, in real time (``await`` inside of it counts)."""
+        self._phase_stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name].add(time.perf_counter() - start)
+            self._phase_stack.pop()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def tick(self, round_trips: int) -> None:
+        self.ticks += 1
+        self.round_trips = round_trips
+        self.round_trip_rate.add(time.monotonic(), round_trips)
+
+    def reach(self, balance: float, now: float) -> None:
+        """Record milestones, that ``balance`` has reached. ``now`` is in time of the game."""
+        if self.started is None:
+            self.started = now
+        for milestone in MILESTONES:
+            if balance >= milestone and milestone not in self.milestones:
+                self.milestones[milestone] = now - self.started
+
+    def snapshot(self) -> dict[str, float]:
+        result: dict[str, float] = {"ticks": self.ticks}
+        if self.ticks:
+            result["round_trips_per_tick"] = self.round_trips / self.ticks
+            result["round_trips_per_second"] = self.round_trip_rate.rate
+        for name, stats in self.phases.items():
+            result[f"phase.{name}.mean_ms"] = stats.mean * 1000
+            result[f"phase.{name}.p90_ms"] = stats.p90 * 1000
+            result[f"phase.{name}.max_ms"] = stats.max * 1000
+        for milestone, seconds in self.milestones.items():
+            result[f"milestone.{milestone}_s"] = seconds
+        result.update(self.gauges)
+        result.update(self.counters)
+        return result
+
+    def to_prometheus(self) -> str:
+        """Render metrics in Prometheus text format."""
+        lines = [
+            f"# HELP {PROMETHEUS_PREFIX}phase_seconds How long phases of the main loop take.",
+            f"# TYPE {PROMETHEUS_PREFIX}phase_seconds histogram",
+        ]
+        for name, stats in self.phases.items():
+            cumulative = 0
+            for bound, count in zip((*PhaseStats.BUCKETS, "+Inf"), stats.buckets, strict=True):
+                cumulative += count
+                lines.append(f'{PROMETHEUS_PREFIX}phase_seconds_bucket{{phase="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{PROMETHEUS_PREFIX}phase_seconds_sum{{phase="{name}"}} {stats.total}')
+            lines.append(f'{PROMETHEUS_PREFIX}phase_seconds_count{{phase="{name}"}} {stats.count}')
+
+        counters = {"ticks": self.ticks, "round_trips": self.round_trips, **self.counters}
+        for name, value in counters.items():
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}{name}_total counter")
+            lines.append(f"{PROMETHEUS_PREFIX}{name}_total {value}")
+        for name, value in self.gauges.items():
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}{name} gauge")
+            lines.append(f"{PROMETHEUS_PREFIX}{name} {value}")
+        if self.milestones:
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}milestone_seconds gauge")
+        for milestone, seconds in self.milestones.items():
+            lines.append(f'{PROMETHEUS_PREFIX}milestone_seconds{{cookies="{milestone}"}} {seconds}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,35 @@
+"""Local HTTP endpoint, which shows :class:`.Metrics` of a run while it is in progress.
+
+``/metrics`` is in Prometheus text format, ``/metrics.json`` is :meth:`.Metrics.snapshot`. Nothing is
+computed until somebody asks, so it can stay on during timed runs.
+"""
+from aiohttp import web
+from loguru import logger
+
+from src.metrics import Metrics
+
+
+class MetricsServer:
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9100) -> None:
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+
+        self.app = web.Application()
+        self.app.router.add_get("/metrics", self._prometheus)
+        self.app.router.add_get("/metrics.json", self._json)
+        self._runner = web.AppRunner(self.app, access_log=None)
+
+    async def start(self) -> None:
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        await self._runner.cleanup()
+
+    async def _prometheus(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.metrics.to_prometheus(), content_type="text/plain", charset="utf-8")
+
+    async def _json(self, request: web.Request) -> web.Response:
+        return web.json_response(self.metrics.snapshot())
@@ -0,0 +1,84 @@
+"""Parses numbers, as the game shows them: ``"1,234"``, ``"1.5 million"``, ``"1.5M"``, ``"5.6e+21"`` and so on.
+
+Suffixes are built the same way, as the game builds them (``formatLong`` and ``formatShort`` in ``main.js``),
+so every magnitude the game can display is covered.
+"""
+import math
+import timeit
+
+import typer
+
+_LONG = [" thousand", " million", " billion", " trillion", " quadrillion"]
+_LONG += [" quintillion", " sextillion", " septillion", " octillion", " nonillion"]
+_LONG += [
+    " " + prefix + suffix
+    for suffix in ("decillion", "vigintillion", "trigintillion", "quadragintillion", "quinquagintillion")
+    + ("sexagintillion", "septuagintillion", "octogintillion", "nonagintillion")
+    for prefix in ("", "un", "duo", "tre", "quattuor", "quin", "sex", "septen", "octo", "novem")
+]
+_SHORT = ["k", "M", "B", "T", "Qa", "Qi", "Sx", "Sp", "Oc", "No"]
+_SHORT += [
+    " " + prefix + suffix
+    for suffix in ("D", "V", "T", "Qa", "Qi", "Sx", "Sp", "O", "N")
+    for prefix in ("", "Un", "Do", "Tr", "Qa", "Qi", "Sx", "Sp", "Oc", "No")
+]
+_SHORT[10] = "Dc"
+
+
+def _suffixes() -> dict[str, float]:
+    # n-th suffix means 10^(3 * (n + 1)), e.g. " thousand" is 10^3
+    table = {suffix: 10.0 ** (3 * (i + 1)) for notation in (_LONG, _SHORT) for i, suffix in enumerate(notation)}
+    # the same, but without spaces around, unless it would be ambiguous (e.g. "T" and " T" are different)
+    for suffix, multiplier in list(table.items()):
+        table.setdefault(suffix.strip(), multiplier)
+    return table
+
+
+SUFFIXES = _suffixes()
+"""Suffix -> multiplier."""
+
+_SUFFIX_CHARACTERS = "".join(sorted(set("".join(SUFFIXES))))
+
+
+def parse_number(text: str) -> float:
+    # no suffix ends with "s", so it can only be from "cookies"
+    text = text.strip().removesuffix("s").removesuffix("cookie").rstrip()
+    number = text.rstrip(_SUFFIX_CHARACTERS)
+    try:
+        value = float(number.replace(",", ""))
+    except ValueError:
+        if text == "Infinity":
+            return math.inf
+        raise ValueError(f"Not a number: {text!r}") from None
+    if len(number) == len(text):
+        return value
+
+    suffix = text[len(number) :]
+    multiplier = SUFFIXES.get(suffix)
+    if multiplier is None:
+        multiplier = SUFFIXES.get(suffix.strip())
+        if multiplier is None:
+            raise ValueError(f"Unknown suffix {suffix!r} in {text!r}")
+    return value * multiplier
+
+
+BENCHMARK_INPUTS = (
+    "15",
+    "1,234,567",
+    "0.1 cookies",
+    "1.500 million",
+    "12.345 quattuorvigintillion",
+    "1.5 UnD",
+    "5e+21",
+)
+
+
+def main(number: int = 200_000) -> None:
+    """Micro-benchmark of :func:`parse_number`."""
+    for text in BENCHMARK_INPUTS:
+        seconds = min(timeit.repeat(lambda: parse_number(text), number=number, repeat=5))
+        print(f"{text!r:>32}: {seconds / number * 1e9:6.0f} ns")
+
+
+if __name__ == "__main__":
+    typer.run(main)
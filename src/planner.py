@@ -0,0 +1,101 @@
+"""Plans what to buy next, buildings and upgrades together, several purchases ahead."""
+import dataclasses
+import heapq
+
+from src.building import PRICE_GROWTH, Building
+from src.upgrade import Upgrade
+
+HORIZON = 10
+"""How many purchases ahead we plan."""
+UPGRADE_GAIN = 0.2
+"""We can't know what an upgrade does without reading the game code, so we assume that it gives us
+this much (relatively) more cookies per second. Most upgrades make one building twice as efficient."""
+MIN_CPS = 0.001
+"""Used instead of zero production, so we still can compare how long we will wait."""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class PlannedPurchase:
+    target: Building | Upgrade
+    price: float
+    at: float
+    """In how many seconds (from now) we should be able to afford it."""
+
+
+def estimate_production(buildings: list[Building]) -> list[float]:
+    """How much each building produces, including those we didn't buy yet.
+
+    For buildings, that we didn't buy yet, we can't know how many they produce. So we estimate that
+    they produce 10 times more than the previous building. A building can produce nothing for a while
+    (e.g. during a debuff), then we use :data:`MIN_CPS` instead.
+    """
+    production: list[float] = []
+    for building in buildings:
+        if building.produces is not None:
+            production.append(max(building.produces, MIN_CPS))
+        else:
+            production.append(production[-1] * 10 if production else MIN_CPS)
+    return production
+
+
+def plan(
+    buildings: list[Building], upgrades: list[Upgrade], balance: float, cps: float, steps: int = HORIZON
+) -> list[PlannedPurchase]:
+    """Plan next ``steps`` purchases.
+
+    Each step we choose the thing with the lowest "time to afford + time to pay off itself". Buildings
+    are kept in a heap by their payback period (which changes only when we buy that building), and it
+    is a lower bound for their score. So we need to look only at a few buildings on top of the heap.
+    Upgrades are assumed to be equally good, so the cheapest one is the only one we consider.
+
+    Buildings and upgrades must not be modified while this runs, as we don't copy them.
+    """
+    if buildings and buildings[0].produces is None:
+        # we can't estimate anything until we buy the first building
+        first = buildings[0]
+        return [PlannedPurchase(first, first.costs, max(first.costs - balance, 0) / max(cps, MIN_CPS))]
+
+    production = estimate_production(buildings)
+    costs = [building.costs for building in buildings]
+    heap = [(costs[i] / production[i], i) for i in range(len(buildings))]
+    heapq.heapify(heap)
+    upgrades = sorted(upgrades, key=lambda upgrade: upgrade.price)
+    next_upgrade = 0
+
+    cps = max(cps, MIN_CPS)
+    now = 0.0
+    result: list[PlannedPurchase] = []
+    for _ in range(steps):
+        best_score, best_building = float("inf"), None
+        if next_upgrade < len(upgrades):
+            price = upgrades[next_upgrade].price
+            best_score = max(price - balance, 0) / cps + price / (cps * UPGRADE_GAIN)
+
+        popped: list[tuple[float, int]] = []
+        while heap and heap[0][0] < best_score:
+            payback, i = heapq.heappop(heap)
+            popped.append((payback, i))
+            score = max(costs[i] - balance, 0) / cps + payback
+            if score < best_score:
+                best_score, best_building = score, i
+        for item in popped:
+            if item[1] != best_building:
+                heapq.heappush(heap, item)
+
+        target: Building | Upgrade
+        if best_building is not None:
+            target, price, gain = buildings[best_building], costs[best_building], production[best_building]
+            costs[best_building] = price * PRICE_GROWTH
+            heapq.heappush(heap, (costs[best_building] / gain, best_building))
+        elif next_upgrade < len(upgrades):
+            target, price, gain = upgrades[next_upgrade], upgrades[next_upgrade].price, cps * UPGRADE_GAIN
+            next_upgrade += 1
+        else:
+            break
+
+        wait = max(price - balance, 0) / cps
+        now += wait
+        balance += wait * cps - price
+        cps += gain
+        result.append(PlannedPurchase(target, price, now))
+    return result
@@ -0,0 +1,154 @@
+"""Profiles Python and the game's JS at the same time, and writes both into one flamegraph.
+
+Python is profiled by a thread, that samples stacks of all other threads. JS is profiled by Chrome itself
+(``Profiler`` domain of CDP). Each sample is attributed to the phase of the main loop, that was running at
+that moment (see :attr:`.Metrics.current_phase`), so the output is in folded stacks format::
+
+    plan;python;ThreadPoolExecutor-0_0;src.planner:plan 42
+    update_state;js;(program) 7
+
+Which can be opened in speedscope, or rendered with ``flamegraph.pl``.
+"""
+import bisect
+import collections
+import pathlib
+import sys
+import threading
+import time
+import types
+import typing as t
+
+from loguru import logger
+from playwright.async_api import CDPSession, Page
+
+from src.metrics import Metrics
+
+IDLE = "idle"
+"""Phase name, for samples taken between phases (e.g. while we sleep until the next tick)."""
+
+
+class _CallFrame(t.TypedDict):
+    functionName: str
+    url: str
+    lineNumber: int
+
+
+class _ProfileNode(t.TypedDict, total=False):
+    id: int
+    callFrame: _CallFrame
+    children: list[int]
+
+
+class _JSProfile(t.TypedDict):
+    nodes: list[_ProfileNode]
+    startTime: float
+    samples: list[int]
+    timeDeltas: list[float]
+
+
+def _python_stack(frame: types.FrameType | None) -> list[str]:
+    stack = []
+    while frame is not None:
+        stack.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}")
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _js_frame(node: _ProfileNode) -> str:
+    frame = node["callFrame"]
+    name = frame["functionName"] or "(anonymous)"
+    if not frame["url"]:
+        return name
+    return f"{name} ({frame['url'].rsplit('/', 1)[-1]}:{frame['lineNumber'] + 1})"
+
+
+class Profiler:
+    """Collects :attr:`stacks` between :meth:`start` and :meth:`stop`.
+
+    Args:
+        metrics: Where to take the current phase from.
+        output: Where to save folded stacks.
+        page: Page to profile JS in. If ``None``, only Python is profiled.
+        interval: Seconds between samples, the same for Python and JS, so their weights are comparable.
+    """
+
+    def __init__(
+        self, metrics: Metrics, output: pathlib.Path, page: Page | None = None, interval: float = 0.005
+    ) -> None:
+        self.metrics = metrics
+        self.output = output
+        self.page = page
+        self.interval = interval
+
+        self.stacks: collections.Counter[str] = collections.Counter()
+        self._timeline: list[tuple[float, str]] = []
+        """When each phase was seen by the sampler, to attribute JS samples to phases."""
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample_python, name="profiler", daemon=True)
+        self._session: CDPSession | None = None
+        self._js_started = 0.0
+
+    async def start(self) -> None:
+        logger.info("Starting profiler...")
+        if self.page is not None:
+            self._session = await self.page.context.new_cdp_session(self.page)
+            await self._session.send("Profiler.enable")
+            await self._session.send("Profiler.setSamplingInterval", {"interval": int(self.interval * 1_000_000)})
+            await self._session.send("Profiler.start")
+            self._js_started = time.monotonic()
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        if self._session is not None:
+            try:
+                result = await self._session.send("Profiler.stop")
+                self._add_js_profile(t.cast(_JSProfile, result["profile"]))
+                await self._session.detach()
+            except Exception as e:  # e.g. the page has crashed, Python samples are still worth saving
+                logger.warning(f"Could not read the JS profile: {e!r}")
+
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        self.output.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()))
+        logger.info(f"Saved profile to {self.output}")
+
+    def _sample_python(self) -> None:
+        me = threading.get_ident()
+        names: dict[int, str] = {}
+        while not self._stop.wait(self.interval):
+            phase = self.metrics.current_phase or IDLE
+            self._timeline.append((time.monotonic(), phase))
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if ident not in names:
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate() if thread.ident)
+                name = names.get(ident, str(ident))
+                self.stacks[";".join((phase, "python", name, *_python_stack(frame)))] += 1
+
+    def _add_js_profile(self, profile: _JSProfile) -> None:
+        nodes = {node["id"]: node for node in profile["nodes"]}
+        parents = {child: node["id"] for node in profile["nodes"] for child in node.get("children", [])}
+        stacks: dict[int, str] = {}
+
+        def stack(leaf: int) -> str:
+            if leaf not in stacks:
+                frames = []
+                node_id = leaf
+                while node_id in parents:  # root node is not a real frame
+                    frames.append(_js_frame(nodes[node_id]))
+                    node_id = parents[node_id]
+                stacks[leaf] = ";".join(reversed(frames))
+            return stacks[leaf]
+
+        # timestamps are microseconds of Chrome's clock, so align them to ours using the moment we started it
+        timestamps = [timestamp for timestamp, _ in self._timeline]
+        offset = self._js_started - profile["startTime"] / 1_000_000
+        timestamp = profile["startTime"]
+        for node_id, delta in zip(profile["samples"], profile["timeDeltas"], strict=True):
+            timestamp += delta
+            index = bisect.bisect_right(timestamps, timestamp / 1_000_000 + offset) - 1
+            phase = self._timeline[index][1] if index >= 0 else IDLE
+            self.stacks[f"{phase};js;{stack(node_id)}"] += 1
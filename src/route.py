@@ -0,0 +1,120 @@
+"""Routes are timelines of purchases. Every run records one, and a good one can be replayed.
+
+The binary format is a header followed by rows: fixed-size numbers (see :data:`ROW`) and the target as
+text, so a file can be appended to while the run is in progress, and read back even if the run has crashed
+in the middle of it. Routes can also be written as CSV, to be edited by hand.
+"""
+import csv
+import dataclasses
+import enum
+import pathlib
+import struct
+import typing as t
+
+import typer
+
+MAGIC = b"CCROUTE2"
+ROW = struct.Struct("<dBdddH")
+"""Seconds since the start, kind, price, balance before the purchase, cookies per second, and length of the
+target, which follows in UTF-8."""
+
+
+class Kind(enum.IntEnum):
+    BUILDING = 0
+    UPGRADE = 1
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class RouteStep:
+    at: float
+    kind: Kind
+    target: int | str
+    """ID of a building, or key of an upgrade."""
+    price: float
+    balance: float
+    cps: float
+
+
+class RouteRecorder:
+    """Appends steps to a route file, each of them is flushed right away."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def record(self, step: RouteStep) -> None:
+        self._file.write(_pack(step))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_route(path: pathlib.Path) -> list[RouteStep]:
+    """Read a route, either binary or CSV (if the file ends with ``.csv``)."""
+    if path.suffix == ".csv":
+        with path.open(newline="") as f:
+            return [
+                RouteStep(
+                    at=float(row["at"]),
+                    kind=Kind[row["kind"].upper()],
+                    target=_target(Kind[row["kind"].upper()], row["target"]),
+                    price=float(row["price"]),
+                    balance=float(row["balance"]),
+                    cps=float(row["cps"]),
+                )
+                for row in csv.DictReader(f)
+            ]
+
+    data = path.read_bytes()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a route file")
+    steps = []
+    offset = len(MAGIC)
+    # the last row may be cut, if the run has crashed while writing it
+    while offset + ROW.size <= len(data):
+        at, kind, price, balance, cps, length = ROW.unpack_from(data, offset)
+        offset += ROW.size
+        if offset + length > len(data):
+            break
+        target = _target(Kind(kind), data[offset : offset + length].decode())
+        steps.append(RouteStep(at, Kind(kind), target, price, balance, cps))
+        offset += length
+    return steps
+
+
+def write_binary(steps: t.Iterable[RouteStep], path: pathlib.Path) -> None:
+    path.write_bytes(MAGIC + b"".join(_pack(step) for step in steps))
+
+
+def write_csv(steps: t.Iterable[RouteStep], path: pathlib.Path) -> None:
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("at", "kind", "target", "price", "balance", "cps"))
+        for step in steps:
+            writer.writerow((step.at, step.kind.name.lower(), step.target, step.price, step.balance, step.cps))
+
+
+def _pack(step: RouteStep) -> bytes:
+    target = str(step.target).encode()
+    return ROW.pack(step.at, step.kind, step.price, step.balance, step.cps, len(target)) + target
+
+
+def _target(kind: Kind, text: str) -> int | str:
+    return int(text) if kind is Kind.BUILDING else text
+
+
+def convert(source: pathlib.Path, destination: pathlib.Path) -> None:
+    """Convert a route between binary and CSV, depending on the suffix of ``destination``."""
+    steps = read_route(source)
+    if destination.suffix == ".csv":
+        write_csv(steps, destination)
+    else:
+        write_binary(steps, destination)
+
+
+if __name__ == "__main__":
+    typer.run(convert)
@@ -0,0 +1,40 @@
+import asyncio
+import typing as t
+
+Wait = t.Callable[[float, asyncio.Event], t.Awaitable[None]]
+
+
+async def wait_for_event(seconds: float, event: asyncio.Event) -> None:
+    """Sleep for ``seconds`` in real time, or until ``event`` is set."""
+    try:
+        await asyncio.wait_for(event.wait(), seconds)
+    except TimeoutError:
+        pass
+
+
+class TickScheduler:
+    """Decides how long the main loop can sleep before the next tick.
+
+    We sleep until we can afford the next planned purchase, but anyone can :meth:`wake` us earlier,
+    e.g. when a golden cookie appears or a new upgrade gets unlocked.
+    """
+
+    def __init__(self, min_delay: float = 0.05, max_delay: float = 5, wait: Wait = wait_for_event) -> None:
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.wait = wait
+        """How we sleep. The simulator doesn't sleep, it lets the game time pass instead."""
+
+        self._wake = asyncio.Event()
+
+    def delay(self, balance: float, cps: float, next_price: float | None) -> float:
+        if next_price is None or cps <= 0:
+            return self.max_delay
+        return min(max((next_price - balance) / cps, self.min_delay), self.max_delay)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def sleep(self, delay: float) -> None:
+        await self.wait(delay, self._wake)
+        self._wake.clear()
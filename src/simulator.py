@@ -0,0 +1,369 @@
+"""Offline model of Cookie Clicker v2.052 economy, so strategies can be compared without a browser.
+
+It is not a full reimplementation of the game. It models buildings (base prices, 15% price growth,
+base production), tiered "twice as efficient" upgrades, the thousand fingers family, mouse upgrades,
+clicking and golden cookies (frenzy, lucky and click frenzy). Grandma synergies, kittens, milk,
+flavored cookies and everything after ascension are not modelled. Time is not ticked frame by frame,
+it jumps from one event (purchase, golden cookie, end of a buff) to the next, which is why one run to
+a million cookies takes milliseconds.
+"""
+import bisect
+import dataclasses
+import enum
+import json
+import math
+import random
+import typing as t
+
+from src import planner
+from src.building import PRICE_GROWTH, Building
+from src.state import RawState
+from src.upgrade import Upgrade
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class BuildingInfo:
+    name: str
+    base_price: float
+    base_cps: float
+
+
+BUILDINGS = (
+    BuildingInfo("Cursor", 15, 0.1),
+    BuildingInfo("Grandma", 100, 1),
+    BuildingInfo("Farm", 1_100, 8),
+    BuildingInfo("Mine", 12_000, 47),
+    BuildingInfo("Factory", 130_000, 260),
+    BuildingInfo("Bank", 1_400_000, 1_400),
+    BuildingInfo("Temple", 20_000_000, 7_800),
+    BuildingInfo("Wizard tower", 330_000_000, 44_000),
+    BuildingInfo("Shipment", 5_100_000_000, 260_000),
+    BuildingInfo("Alchemy lab", 75_000_000_000, 1_600_000),
+    BuildingInfo("Portal", 1e12, 1e7),
+    BuildingInfo("Time machine", 1.4e13, 6.5e7),
+    BuildingInfo("Antimatter condenser", 1.7e14, 4.3e8),
+    BuildingInfo("Prism", 2.1e15, 2.9e9),
+    BuildingInfo("Chancemaker", 2.6e16, 2.1e10),
+    BuildingInfo("Fractal engine", 3.1e17, 1.5e11),
+    BuildingInfo("Javascript console", 7.1e19, 1.1e12),
+    BuildingInfo("Idleverse", 1.2e22, 8.3e12),
+    BuildingInfo("Cortex baker", 1.9e24, 6.4e13),
+)
+
+
+class Effect(enum.Enum):
+    DOUBLE = "double"
+    """Building (and the mouse, for cursors) is twice as efficient."""
+    THOUSAND_FINGERS = "thousand fingers"
+    """The mouse and cursors gain +0.1 cookies for each non-cursor building."""
+    MULTIPLY_FINGERS = "multiply fingers"
+    """Bonus from thousand fingers is 5 times bigger."""
+    MOUSE = "mouse"
+    """Clicking gains +1% of CpS."""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class UpgradeInfo:
+    name: str
+    price: float
+    effect: Effect
+    building: int | None
+    """Which building the upgrade needs to be unlocked. ``None`` means hand-made cookies."""
+    unlock_at: float
+
+
+def _upgrades() -> tuple[UpgradeInfo, ...]:
+    upgrades = [
+        UpgradeInfo("Reinforced index finger", 100, Effect.DOUBLE, 0, 1),
+        UpgradeInfo("Carpal tunnel prevention cream", 500, Effect.DOUBLE, 0, 1),
+        UpgradeInfo("Ambidextrous", 10_000, Effect.DOUBLE, 0, 10),
+        UpgradeInfo("Thousand fingers", 100_000, Effect.THOUSAND_FINGERS, 0, 25),
+        UpgradeInfo("Million fingers", 10_000_000, Effect.MULTIPLY_FINGERS, 0, 50),
+        UpgradeInfo("Plastic mouse", 50_000, Effect.MOUSE, None, 1_000),
+        UpgradeInfo("Iron mouse", 5_000_000, Effect.MOUSE, None, 100_000),
+    ]
+    for i, building in enumerate(BUILDINGS[1:], start=1):
+        for tier, (unlock_at, multiplier) in enumerate(((1, 10), (5, 50), (25, 500), (50, 50_000), (100, 5e6))):
+            upgrades.append(
+                UpgradeInfo(
+                    f"{building.name} tier {tier + 1}", building.base_price * multiplier, Effect.DOUBLE, i, unlock_at
+                )
+            )
+    return tuple(sorted(upgrades, key=lambda upgrade: upgrade.price))
+
+
+UPGRADES = _upgrades()
+"""From the cheapest, as the game sorts the store."""
+BASE_PRICES = [building.base_price for building in BUILDINGS]
+HANDMADE_UNLOCKS = sorted(upgrade.unlock_at for upgrade in UPGRADES if upgrade.building is None)
+
+GOLDEN_COOKIE_SPAWN = (5 * 60, 15 * 60)
+"""Minimum and maximum time between golden cookies, in seconds."""
+GOLDEN_COOKIE_LIFETIME = 13
+GOLDEN_COOKIE_EFFECTS = (("frenzy", 0.5), ("lucky", 0.45), ("click frenzy", 0.05))
+FRENZY = (7, 77)
+"""Multiplier and duration of the frenzy buff."""
+CLICK_FRENZY = (777, 13)
+
+
+class Simulator:
+    def __init__(
+        self, seed: int | None = None, clicks_per_second: float = 50, auto_collect_golden_cookies: bool = True
+    ) -> None:
+        self.clicks_per_second = clicks_per_second
+        self.auto_collect_golden_cookies = auto_collect_golden_cookies
+
+        self.time = 0.0
+        self.cookies = 0.0
+        self.earned = 0.0
+        self.handmade = 0.0
+        self.owned = [0] * len(BUILDINGS)
+        self.bought_upgrades: set[str] = set()
+        self.golden_cookies_collected = 0
+        self.clicks = 0.0
+
+        self._random = random.Random(seed)
+        self._multipliers = [1.0] * len(BUILDINGS)
+        self._click_multiplier = 1.0
+        self._fingers = 0.0
+        self._mouse = 0.0
+        self._cps_buff = (1.0, 0.0)
+        """Multiplier and when it ends."""
+        self._click_buff = (1.0, 0.0)
+        self._next_golden_cookie = self._random.uniform(*GOLDEN_COOKIE_SPAWN)
+        self._golden_cookie_until: float | None = None
+        self._upgrades_version = 0
+        self._available_upgrades: tuple[UpgradeInfo, ...] = ()
+        self._purchases = 0
+        # both of these change only after a purchase, but are needed for every little step
+        self._base_cps: float | None = None
+        self._available_upgrades_key: tuple[int, int] | None = None
+
+    def save(self) -> str:
+        """Progress, like the game saves it. Buffs and golden cookies on the screen are not saved."""
+        return json.dumps(
+            {
+                "time": self.time,
+                "cookies": self.cookies,
+                "earned": self.earned,
+                "handmade": self.handmade,
+                "owned": self.owned,
+                "upgrades": sorted(self.bought_upgrades),
+                "golden_cookies": self.golden_cookies_collected,
+                "clicks": self.clicks,
+            }
+        )
+
+    @classmethod
+    def load(cls, save: str, seed: int | None = None) -> t.Self:
+        """Continue from what :meth:`save` has returned."""
+        data = json.loads(save)
+        simulator = cls(seed)
+        simulator.time, simulator.clicks = data["time"], data["clicks"]
+        simulator.cookies, simulator.earned, simulator.handmade = data["cookies"], data["earned"], data["handmade"]
+        simulator.owned = data["owned"]
+        simulator.golden_cookies_collected = data["golden_cookies"]
+        simulator._next_golden_cookie += simulator.time
+        for upgrade in UPGRADES:  # in the same order as usual, so the effects add up the same
+            if upgrade.name in data["upgrades"]:
+                simulator.bought_upgrades.add(upgrade.name)
+                simulator._apply(upgrade)
+        simulator._purchased()
+        return simulator
+
+    def price(self, building: int) -> float:
+        return math.ceil(BUILDINGS[building].base_price * PRICE_GROWTH ** self.owned[building])
+
+    def produces(self, building: int) -> float:
+        """How many cookies per second one building produces (without buffs)."""
+        produces = BUILDINGS[building].base_cps * self._multipliers[building]
+        if building == 0:
+            produces += self._fingers * (sum(self.owned) - self.owned[0])
+        return produces
+
+    def base_cps(self) -> float:
+        if self._base_cps is None:
+            self._base_cps = sum(self.owned[i] * self.produces(i) for i in range(len(BUILDINGS)) if self.owned[i])
+        return self._base_cps
+
+    def cps(self) -> float:
+        """Cookies per second from buildings, as the game shows it."""
+        return self.base_cps() * (self._cps_buff[0] if self.time < self._cps_buff[1] else 1)
+
+    def click_value(self) -> float:
+        value = self._click_multiplier + self._fingers * (sum(self.owned) - self.owned[0]) + self._mouse * self.cps()
+        return value * (self._click_buff[0] if self.time < self._click_buff[1] else 1)
+
+    def income(self) -> float:
+        """All cookies we get per second, from buildings and clicking."""
+        return self.cps() + self.click_value() * self.clicks_per_second
+
+    def unlocked(self) -> range:
+        """Buildings, that are shown in the store. They are sorted by price, so it is always a prefix."""
+        return range(bisect.bisect_right(BASE_PRICES, self.earned))
+
+    def available_upgrades(self) -> tuple[UpgradeInfo, ...]:
+        """Upgrades in the store, from the cheapest."""
+        key = (self._purchases, bisect.bisect_right(HANDMADE_UNLOCKS, self.handmade))
+        if key == self._available_upgrades_key:
+            return self._available_upgrades
+        self._available_upgrades_key = key
+
+        owned, handmade = self.owned, self.handmade
+        available = tuple(
+            upgrade
+            for upgrade in UPGRADES
+            if upgrade.name not in self.bought_upgrades
+            and (handmade if upgrade.building is None else owned[upgrade.building]) >= upgrade.unlock_at
+        )
+        if available != self._available_upgrades:
+            self._available_upgrades = available
+            self._upgrades_version += 1
+        return available
+
+    @property
+    def golden_cookie_on_screen(self) -> bool:
+        return self._golden_cookie_until is not None
+
+    def buy_building(self, building: int) -> bool:
+        price = self.price(building)
+        if price > self.cookies or building not in self.unlocked():
+            return False
+        self.cookies -= price
+        self.owned[building] += 1
+        self._purchased()
+        return True
+
+    def buy_upgrade(self, name: str) -> bool:
+        upgrade = next((upgrade for upgrade in self.available_upgrades() if upgrade.name == name), None)
+        if upgrade is None or upgrade.price > self.cookies:
+            return False
+        self.cookies -= upgrade.price
+        self.bought_upgrades.add(name)
+        self._apply(upgrade)
+        self._purchased()
+        return True
+
+    def _apply(self, upgrade: UpgradeInfo) -> None:
+        if upgrade.effect is Effect.DOUBLE:
+            assert upgrade.building is not None
+            self._multipliers[upgrade.building] *= 2
+            if upgrade.building == 0:
+                self._click_multiplier *= 2
+        elif upgrade.effect is Effect.THOUSAND_FINGERS:
+            self._fingers += 0.1
+        elif upgrade.effect is Effect.MULTIPLY_FINGERS:
+            self._fingers *= 5
+        elif upgrade.effect is Effect.MOUSE:
+            self._mouse += 0.01
+
+    def _purchased(self) -> None:
+        self._purchases += 1
+        self._base_cps = None
+
+    def collect_golden_cookie(self) -> bool:
+        if self._golden_cookie_until is None:
+            return False
+        self._golden_cookie_until = None
+        self.golden_cookies_collected += 1
+
+        effect = self._random.choices(
+            [name for name, _ in GOLDEN_COOKIE_EFFECTS], [weight for _, weight in GOLDEN_COOKIE_EFFECTS]
+        )[0]
+        if effect == "frenzy":
+            self._cps_buff = (FRENZY[0], self.time + FRENZY[1])
+        elif effect == "click frenzy":
+            self._click_buff = (CLICK_FRENZY[0], self.time + CLICK_FRENZY[1])
+        else:
+            self._earn(min(self.cookies * 0.15, self.cps() * 15 * 60) + 13, handmade=0)
+        return True
+
+    def _earn(self, cookies: float, handmade: float) -> None:
+        self.cookies += cookies
+        self.earned += cookies
+        self.handmade += handmade
+
+    def advance(self, seconds: float) -> None:
+        """Let the game run for ``seconds``."""
+        end = self.time + seconds
+        while self.time < end:
+            # income is constant until the next event, so we can jump straight to it
+            events = [end, self._next_golden_cookie]
+            for _, until in (self._cps_buff, self._click_buff):
+                if until > self.time:
+                    events.append(until)
+            if self._golden_cookie_until is not None:
+                events.append(self._golden_cookie_until)
+            segment = min(events) - self.time
+
+            self.clicks += self.clicks_per_second * segment
+            clicks = self.click_value() * self.clicks_per_second * segment
+            self._earn(self.cps() * segment + clicks, handmade=clicks)
+            self.time += segment
+
+            if self.time >= self._next_golden_cookie:
+                self._next_golden_cookie = self.time + self._random.uniform(*GOLDEN_COOKIE_SPAWN)
+                self._golden_cookie_until = self.time + GOLDEN_COOKIE_LIFETIME
+                if self.auto_collect_golden_cookies:
+                    self.collect_golden_cookie()
+            if self._golden_cookie_until is not None and self.time >= self._golden_cookie_until:
+                self._golden_cookie_until = None
+
+    def time_until(self, cookies: float) -> float:
+        """How long until we have ``cookies``, if nothing changes. ``math.inf`` if we produce nothing."""
+        if self.cookies >= cookies:
+            return 0
+        income = self.income()
+        if income <= 0:
+            return math.inf
+        # a bit more, so floating point errors don't leave us a tiny bit short
+        return (cookies - self.cookies) / income + 1e-6
+
+    def snapshot(self) -> RawState:
+        """The state, as ``snapshot.js`` would read it from the page."""
+        return {
+            "balance": str(math.floor(self.cookies)),
+            "cps": str(self.cps()),
+            "products": [
+                {"id": i, "price": str(self.price(i)), "owned": str(self.owned[i]) if self.owned[i] else ""}
+                for i in self.unlocked()
+            ],
+            "upgrades": [
+                {"htmlId": f"upgrade{i}", "key": upgrade.name} for i, upgrade in enumerate(self.available_upgrades())
+            ],
+            "upgradesVersion": self._upgrades_version,
+            "shimmers": int(self.golden_cookie_on_screen),
+        }
+
+    def run(self, target: float = 1_000_000, horizon: int = 1) -> float:
+        """Let :func:`planner.plan` play until we have earned ``target`` cookies. Returns how long it took.
+
+        Long horizons are much slower, and in the simulator planning is the only thing that costs time.
+        Returns ``math.inf``, if we produce nothing and nothing else can give us cookies.
+        """
+        while self.earned < target:
+            buildings = [
+                Building(i, self.produces(i) if self.owned[i] else None, self.price(i)) for i in self.unlocked()
+            ]
+            upgrades = [Upgrade(upgrade.name, upgrade.name, upgrade.price) for upgrade in self.available_upgrades()]
+            plan = planner.plan(buildings, upgrades, self.cookies, self.income(), steps=horizon)
+            if not plan:
+                delay = max(self.time_until(BUILDINGS[0].base_price), 1)
+            else:
+                delay = min(self.time_until(plan[0].price), self.time_until(self.cookies + target - self.earned))
+            if math.isinf(delay):
+                if not self.auto_collect_golden_cookies:
+                    return math.inf
+                delay = GOLDEN_COOKIE_SPAWN[1]  # only golden cookies can give us something
+            self.advance(delay)
+            if not plan:
+                continue
+
+            step = plan[0]
+            if self.earned >= target:
+                break
+            if isinstance(step.target, Building):
+                self.buy_building(step.target.id)
+            else:
+                self.buy_upgrade(step.target.key)
+        return self.time
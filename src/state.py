@@ -0,0 +1,140 @@
+"""Everything logic needs to know about the game.
+
+The page sends us the state either as a full snapshot (one round trip per tick), or as a stream of
+deltas, pushed as soon as something changes. Both are applied the same way by :class:`StateCache`.
+"""
+import collections
+import dataclasses
+import time
+import typing as t
+
+from src.number_format import parse_number
+
+
+class RawProduct(t.TypedDict):
+    id: int
+    price: str
+    owned: str
+
+
+class RawUpgrade(t.TypedDict):
+    htmlId: str
+    key: str
+
+
+class RawState(t.TypedDict, total=False):
+    """What ``snapshot.js`` returns. Deltas contain only changed keys."""
+
+    balance: str
+    cps: str
+    products: list[RawProduct]
+    upgrades: list[RawUpgrade]
+    upgradesVersion: float
+    shimmers: int
+
+
+@dataclasses.dataclass(slots=True)
+class ProductState:
+    id: int
+    price: float
+    owned: int
+
+
+@dataclasses.dataclass(slots=True)
+class UpgradeState:
+    html_id: str
+    key: str
+    """Identifies the upgrade, unlike :attr:`html_id` which is just a position in the store."""
+
+
+@dataclasses.dataclass
+class GameState:
+    balance: float
+    cps: float
+    products: list[ProductState]
+    upgrades: list[UpgradeState]
+    upgrades_version: float
+    """Changes every time the upgrades store gets rebuilt."""
+    shimmers: int
+    """Number of golden cookies (and other shimmers) on the screen."""
+
+    @classmethod
+    def empty(cls) -> t.Self:
+        return cls(balance=0, cps=0, products=[], upgrades=[], upgrades_version=0, shimmers=0)
+
+    def update(self, raw: RawState) -> None:
+        """Apply a full snapshot or a delta from the page."""
+        if "balance" in raw:
+            self.balance = parse_number(raw["balance"])
+        if "cps" in raw:
+            self.cps = parse_number(raw["cps"])
+        if "products" in raw:
+            self.products = [
+                ProductState(
+                    id=product["id"],
+                    price=parse_number(product["price"]),
+                    owned=int(parse_number(product["owned"])) if product["owned"] else 0,
+                )
+                for product in raw["products"]
+            ]
+        if "upgrades" in raw:
+            self.upgrades = [UpgradeState(html_id=upgrade["htmlId"], key=upgrade["key"]) for upgrade in raw["upgrades"]]
+        if "upgradesVersion" in raw:
+            self.upgrades_version = raw["upgradesVersion"]
+        if "shimmers" in raw:
+            self.shimmers = raw["shimmers"]
+
+
+class RateWindow:
+    """How many cookies we have produced per second, over the last :attr:`seconds`.
+
+    When balance goes down, we bought something, so we assume that during that time we produced as
+    much as before, instead of breaking the rate.
+    """
+
+    def __init__(self, seconds: float = 10) -> None:
+        self.seconds = seconds
+
+        self._samples: collections.deque[tuple[float, float]] = collections.deque()
+        self._produced = 0.0
+        self._last: tuple[float, float] | None = None
+
+    @property
+    def rate(self) -> float:
+        if len(self._samples) < 2:
+            return 0
+        (first_timestamp, first_produced), (last_timestamp, last_produced) = self._samples[0], self._samples[-1]
+        if last_timestamp == first_timestamp:
+            return 0
+        return (last_produced - first_produced) / (last_timestamp - first_timestamp)
+
+    def add(self, timestamp: float, balance: float) -> None:
+        if self._last is not None:
+            last_timestamp, last_balance = self._last
+            produced = balance - last_balance
+            if produced < 0:
+                produced = self.rate * (timestamp - last_timestamp)
+            self._produced += produced
+        self._last = timestamp, balance
+
+        self._samples.append((timestamp, self._produced))
+        while timestamp - self._samples[0][0] > self.seconds:
+            self._samples.popleft()
+
+
+class StateCache:
+    """Latest known :class:`GameState`, which logic can read without waiting for the page."""
+
+    def __init__(self, clock: t.Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.state = GameState.empty()
+        self.production = RateWindow()
+        self.listeners: list[t.Callable[[RawState], None]] = []
+        """Called after every applied snapshot or delta."""
+
+    def apply(self, raw: RawState) -> None:
+        self.state.update(raw)
+        if "balance" in raw:
+            self.production.add(self.clock(), self.state.balance)
+        for listener in self.listeners:
+            listener(raw)
@@ -0,0 +1,122 @@
+"""Owner of every background task, so a failing one can't flood logs or take down the main loop.
+
+A task is a step, that is repeated every ``interval`` seconds. When a step fails, the next attempt is
+delayed twice as long each time (backoff). After :attr:`TaskSupervisor.threshold` failures in a row,
+the circuit opens: the task rests for :attr:`TaskSupervisor.cooldown` seconds, and then gets one
+attempt to recover. Only the first failure in a row is logged with a traceback.
+"""
+import asyncio
+import dataclasses
+import enum
+import typing as t
+
+from loguru import logger
+
+from src.metrics import Metrics
+
+Step = t.Callable[[], t.Awaitable[None]]
+
+
+class TaskState(enum.Enum):
+    RUNNING = "running"
+    BACKING_OFF = "backing_off"
+    """Failed recently, retrying less often."""
+    OPEN = "open"
+    """Failed too many times in a row, resting before one more attempt."""
+    STOPPED = "stopped"
+
+
+@dataclasses.dataclass(slots=True)
+class TaskHealth:
+    state: TaskState = TaskState.RUNNING
+    failures: int = 0
+    """Failures in a row, reset by the first success."""
+    total_failures: int = 0
+    last_error: str | None = None
+
+
+class TaskSupervisor:
+    def __init__(
+        self, metrics: Metrics | None = None, threshold: int = 5, cooldown: float = 300, max_delay: float = 300
+    ) -> None:
+        self.metrics = metrics
+        """Where health of every task goes, as ``task_<name>_up`` gauges and ``task_<name>_failures`` counters."""
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_delay = max_delay
+        """Longest backoff, before the circuit opens."""
+        self.health: dict[str, TaskHealth] = {}
+
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+
+    def every(self, name: str, interval: float, step: Step, delay_first: bool = False) -> None:
+        """Run ``step`` every ``interval`` seconds, until :meth:`shutdown`.
+
+        Args:
+            delay_first: Wait ``interval`` before the first run too.
+        """
+        if name in self._tasks:
+            raise ValueError(f"Task {name!r} is already running")
+        self.health[name] = TaskHealth()
+        self._report(name)
+        self._tasks[name] = asyncio.create_task(self._run(name, interval, step, delay_first), name=name)
+
+    async def shutdown(self) -> None:
+        """Cancel every task and wait until they are really done."""
+        tasks, self._tasks = self._tasks, {}
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for name in tasks:
+            self.health[name].state = TaskState.STOPPED
+            self._report(name)
+
+    async def _run(self, name: str, interval: float, step: Step, delay_first: bool) -> None:
+        if delay_first:
+            await asyncio.sleep(interval)
+        while True:
+            try:
+                await step()
+            except Exception as e:
+                delay = self._on_failure(name, interval, e)
+            else:
+                self._on_success(name)
+                delay = interval
+            await asyncio.sleep(delay)
+
+    def _on_success(self, name: str) -> None:
+        health = self.health[name]
+        if health.failures:
+            logger.info(f"Task {name!r} has recovered after {health.failures} failures in a row")
+        health.state = TaskState.RUNNING
+        health.failures = 0
+        self._report(name)
+
+    def _on_failure(self, name: str, interval: float, error: Exception) -> float:
+        """Record the failure and return, how long to wait before the next attempt."""
+        health = self.health[name]
+        health.failures += 1
+        health.total_failures += 1
+        health.last_error = repr(error)
+        if self.metrics is not None:
+            self.metrics.count(f"task_{name}_failures")
+
+        if health.failures == 1:
+            logger.opt(exception=error).error(f"Task {name!r} has failed")
+        elif health.failures < self.threshold:
+            logger.warning(f"Task {name!r} has failed {health.failures} times in a row: {error!r}")
+
+        if health.failures >= self.threshold:
+            if health.state is not TaskState.OPEN:
+                logger.error(f"Task {name!r} keeps failing, pausing it for {self.cooldown:.0f}s")
+            health.state = TaskState.OPEN
+            delay = self.cooldown
+        else:
+            health.state = TaskState.BACKING_OFF
+            delay = min(interval * 2 ** (health.failures - 1), self.max_delay)
+        self._report(name)
+        return delay
+
+    def _report(self, name: str) -> None:
+        if self.metrics is not None:
+            self.metrics.gauges[f"task_{name}_up"] = float(self.health[name].state is TaskState.RUNNING)
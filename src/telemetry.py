@@ -0,0 +1,41 @@
+"""Per-tick history of a run, in a memory-mapped ring buffer of fixed size.
+
+The file is a :data:`HEADER` followed by ``capacity`` rows of :data:`ROW`. When it is full, the oldest rows
+are overwritten, so memory (and disk) usage never grows, however long the run is. Writing a row doesn't
+allocate anything but the numbers themselves. See :mod:`src.analysis` for reading it.
+"""
+import mmap
+import pathlib
+import struct
+
+MAGIC = b"CCTELEM1"
+HEADER = struct.Struct("<8sQQ")
+"""Magic, capacity (in rows), how many rows were written in total."""
+ROW = struct.Struct("<ddddIf")
+"""Time (of the game, in seconds), balance, cookies per second, clicks, buildings owned, tick latency (seconds)."""
+FIELDS = ("time", "balance", "cps", "clicks", "buildings", "latency")
+
+
+class TelemetryRing:
+    def __init__(self, path: pathlib.Path, capacity: int = 1 << 16) -> None:
+        self.path = path
+        self.capacity = capacity
+        self.written = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            f.truncate(HEADER.size + capacity * ROW.size)
+        self._file = path.open("r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        HEADER.pack_into(self._map, 0, MAGIC, capacity, 0)
+
+    def write(self, time: float, balance: float, cps: float, clicks: float, buildings: int, latency: float) -> None:
+        offset = HEADER.size + (self.written % self.capacity) * ROW.size
+        ROW.pack_into(self._map, offset, time, balance, cps, clicks, buildings, latency)
+        self.written += 1
+        HEADER.pack_into(self._map, 0, MAGIC, self.capacity, self.written)
+
+    def close(self) -> None:
+        self._map.flush()
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,56 @@
+import bisect
+import dataclasses
+
+from loguru import logger
+
+from src.backend import GameBackend
+from src.number_format import parse_number
+from src.state import UpgradeState
+
+
+@dataclasses.dataclass(slots=True)
+class Upgrade:
+    key: str
+    html_id: str
+    price: float
+
+
+class UpgradeIndex:
+    """Prices of upgrades, that are cached until the upgrades store changes.
+
+    Price of an upgrade never changes, so we read it only once - when the upgrade appears in the store.
+    """
+
+    def __init__(self) -> None:
+        self._prices: dict[str, float] = {}
+        self._html_ids: dict[str, str] = {}
+        self._by_price: list[tuple[float, str]] = []
+        self._version: float | None = None
+
+    async def sync(self, backend: GameBackend, upgrades: list[UpgradeState], version: float) -> None:
+        if version == self._version:
+            return
+        self._version = version
+
+        new = [upgrade for upgrade in upgrades if upgrade.key not in self._prices]
+        if new:
+            prices = await backend.read_upgrade_prices([upgrade.html_id for upgrade in new])
+            for upgrade, price in zip(new, prices, strict=True):
+                if price is None:
+                    logger.error(f"Could not find price for upgrade {upgrade.html_id}")
+                    self._version = None  # try again on the next sync
+                    continue
+                self._prices[upgrade.key] = parse_number(price)
+
+        self._html_ids = {upgrade.key: upgrade.html_id for upgrade in upgrades if upgrade.key in self._prices}
+        self._by_price = sorted((self._prices[key], key) for key in self._html_ids)
+
+    def by_price(self) -> list[Upgrade]:
+        return [Upgrade(key, self._html_ids[key], price) for price, key in self._by_price]
+
+    def remove(self, upgrade: Upgrade) -> None:
+        """Forget about the upgrade until the store is rebuilt, e.g. because we just bought it."""
+        index = bisect.bisect_left(self._by_price, (upgrade.price, upgrade.key))
+        if index < len(self._by_price) and self._by_price[index] == (upgrade.price, upgrade.key):
+            del self._by_price[index]
+        del self._html_ids[upgrade.key]
@@ -1,7 +1,11 @@
 """Module for some useful utils."""
 import asyncio
+import math
+import os
+import pathlib
+import tempfile
 import typing as t
-from functools import wraps
+from functools import cache, wraps
 
 
 class Singleton(type):
@@ -36,5 +40,30 @@ def async_to_sync(f: t.Callable[_P, t.Awaitable[_R]]) -> t.Callable[_P, _R]:  #
     return wrapper
 
 
-def extract_number_from_string(s: str) -> float:
-    return float(s.strip().removesuffix("s").removesuffix("cookie").replace(",", "").strip())
+def percentile(sorted_values: t.Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile, which is always one of the values (so it is honest for small samples)."""
+    return sorted_values[max(math.ceil(len(sorted_values) * percent / 100) - 1, 0)]
+
+
+def write_atomically(path: pathlib.Path, data: bytes) -> None:
+    """Write ``data`` so anyone reading ``path`` at the same time, or after a crash, never sees a half-written file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".part")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def rss_bytes() -> int | None:
+    """Memory used by this process right now. ``None`` if we can't know (not on Linux)."""
+    try:
+        resident_pages = int(pathlib.Path("/proc/self/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+@cache
+def read_js(name: str) -> str:
+    """Read a script from ``src/js``, so it can be passed to ``page.evaluate``."""
+    return (pathlib.Path(__file__).parent / "js" / name).read_text()
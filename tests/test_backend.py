@@ -0,0 +1,158 @@
+"""Tests for ``src/backend/memory.py``."""
+import asyncio
+import pathlib
+import typing as t
+
+import pytest
+import pytest_mock
+
+from src.backend.memory import InMemoryBackend
+from src.checkpoint import Checkpoints
+from src.logic.all import STALL_TIMEOUT, AllLogic
+from src.route import Kind, RouteRecorder, read_route
+from src.simulator import Simulator
+from src.state import RawState
+
+
+class LaggingBackend(InMemoryBackend):
+    """Pushes changes of the state late, like ``state_stream.js`` does, but at most once per second, so it's obvious."""
+
+    def __init__(self, simulator: Simulator) -> None:
+        super().__init__(simulator)
+        self._pending: RawState = {}
+        self._push: t.Callable[[RawState], None] | None = None
+        self._interval = 0.0
+        self._next_push = 0.0
+
+    async def stream_state(self, callback: t.Callable[[RawState], None], interval: float) -> None:
+        self._interval = max(interval, 1)
+        await super().stream_state(self._buffer, interval)
+        self._push = callback
+        self._flush()
+
+    async def sync_state(self) -> None:
+        await super().sync_state()
+        self._flush()
+
+    async def wait(self, seconds: float, wake: asyncio.Event) -> None:
+        await super().wait(seconds, wake)
+        if self.simulator.time >= self._next_push:
+            self._flush()
+
+    def _buffer(self, delta: RawState) -> None:
+        self._pending.update(delta)
+
+    def _flush(self) -> None:
+        if self._push is not None and self._pending:
+            delta, self._pending = self._pending, {}
+            self._push(delta)
+        self._next_push = self.simulator.time + self._interval
+
+
+@pytest.mark.parametrize("push_state", (True, False))
+def test_logic_plays_simulator(push_state: bool) -> None:
+    """Tests that the same logic, that plays in the browser, can play the simulator."""
+
+    async def run() -> Simulator:
+        simulator = Simulator(seed=0)
+        logic = AllLogic(InMemoryBackend(simulator))
+        if push_state:
+            await logic.stream_state()
+        await logic.click_cookie_in_the_background(50)
+        await logic.run(10_000)
+        return simulator
+
+    simulator = asyncio.run(run())
+    assert simulator.cookies > 10_000
+    assert sum(simulator.owned) > 0
+    assert simulator.clicks > 0
+
+
+def test_golden_cookies_are_reported(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that watched golden cookies are collected and reported, like the page's observer does."""
+    simulator = Simulator(seed=0)
+    backend = InMemoryBackend(simulator)
+    collect = mocker.spy(backend, "collect_shimmers")
+
+    async def run() -> AllLogic:
+        logic = AllLogic(backend)
+        await logic.watch_golden_cookies()
+        await logic.run(100_000)
+        return logic
+
+    logic = asyncio.run(run())
+    assert logic.golden_cookies_caught == simulator.golden_cookies_collected > 0
+    assert logic.metrics.counters["golden_cookies_seen"] == logic.golden_cookies_caught
+    collect.assert_not_called()  # the observer has already collected them
+
+
+def test_watched_shimmers_are_collected_right_away() -> None:
+    """Tests that every golden cookie is collected as soon as it appears, and reported to the callback."""
+    simulator = Simulator(seed=0)
+    backend = InMemoryBackend(simulator)
+    shimmers: list[dict[str, str]] = []
+
+    async def run() -> None:
+        await backend.watch_shimmers(shimmers.append)
+        await backend.wait(60 * 60, asyncio.Event())
+
+    asyncio.run(run())
+    assert simulator.golden_cookies_collected > 0
+    assert shimmers == [{"className": "shimmer"}] * simulator.golden_cookies_collected
+    assert not simulator.golden_cookie_on_screen
+
+
+def test_upgrade_prices_by_store_position() -> None:
+    """Tests that upgrades are addressed by their position in the store, like ``#upgradeN`` in the page."""
+    simulator = Simulator(seed=0)
+    simulator.owned[0] = 1
+    backend = InMemoryBackend(simulator)
+    available = simulator.available_upgrades()
+
+    prices = asyncio.run(backend.read_upgrade_prices([f"upgrade{i}" for i in range(len(available) + 1)]))
+    assert prices == [str(upgrade.price) for upgrade in available] + [None]
+
+
+def test_hung_game_continues_from_checkpoint(tmp_path: pathlib.Path) -> None:
+    """Tests that a hung game is noticed by the watchdog, and the run continues from the last checkpoint."""
+
+    async def run() -> tuple[AllLogic, InMemoryBackend]:
+        logic = AllLogic(InMemoryBackend(Simulator(seed=0)))
+        await logic.setup(target_cps=50)
+        logic.start_checkpoints(Checkpoints(tmp_path / "run.save"))
+        await logic.run(1_000)
+        await logic.checkpoint()
+        hung = logic.backend
+
+        # nobody looks at the game, as if it had hung
+        await hung.wait(STALL_TIMEOUT + 1, asyncio.Event())
+        await logic.watchdog()
+        await logic.run(10_000)
+        await logic.stop()
+        return logic, t.cast(InMemoryBackend, hung)
+
+    logic, hung = asyncio.run(run())
+    assert logic.metrics.counters["recoveries"] == 1
+    assert logic.backend is not hung
+    assert logic.balance > 10_000
+    assert sum(t.cast(InMemoryBackend, logic.backend).simulator.owned) >= sum(hung.simulator.owned)
+    assert logic.backend.round_trips > hung.round_trips
+
+
+def test_stale_state_doesnt_cause_phantom_purchases(tmp_path: pathlib.Path) -> None:
+    """Tests that a tick right after a purchase doesn't see the old balance, and buy the same building again."""
+    simulator = Simulator(seed=0)
+
+    async def run() -> AllLogic:
+        logic = AllLogic(LaggingBackend(simulator))
+        logic.recorder = RouteRecorder(tmp_path / "run.route")
+        await logic.setup(target_cps=50)
+        await logic.run(10_000)
+        await logic.stop()
+        logic.recorder.close()
+        return logic
+
+    logic = asyncio.run(run())
+    route = read_route(tmp_path / "run.route")
+    assert logic.metrics.counters["buildings_bought"] == sum(simulator.owned)
+    assert sum(step.kind is Kind.BUILDING for step in route) == sum(simulator.owned)
@@ -0,0 +1,41 @@
+"""Tests for ``src/benchmark.py``."""
+import math
+
+from src.benchmark import regressions
+
+
+def test_regressions() -> None:
+    """Tests that only metrics, which got worse by more than the tolerance, are regressions."""
+    baseline = {
+        "milestone.1000_s": 100,
+        "round_trips_per_tick": 2,
+        "clicks_per_second": 50,
+        "phase.plan.mean_ms": 10,
+        "phase.update_state.mean_ms": 0.001,
+        "phase.sync_store.mean_ms": 0.05,
+        "phase.sync_store.max_ms": 0.1,
+        "ticks": 100,
+    }
+    current = {
+        "milestone.1000_s": 110,  # worse, but within the tolerance
+        "round_trips_per_tick": 3,  # worse
+        "clicks_per_second": 30,  # worse, as higher is better here
+        "phase.plan.mean_ms": 20,  # worse
+        "phase.update_state.mean_ms": 0.005,  # 5 times worse, but it is just noise
+        "phase.sync_store.mean_ms": 0.1,  # worse, even if far below a millisecond
+        "phase.sync_store.max_ms": 1,  # one slow tick doesn't matter
+        "ticks": 1000,  # doesn't matter
+    }
+    assert regressions(current, baseline, tolerance=0.2) == {
+        "round_trips_per_tick": (2, 3),
+        "clicks_per_second": (50, 30),
+        "phase.plan.mean_ms": (10, 20),
+        "phase.sync_store.mean_ms": (0.05, 0.1),
+    }
+
+
+def test_missing_metric_is_a_regression() -> None:
+    """Tests that a metric, which is not there anymore (e.g. a milestone wasn't reached), is a regression."""
+    (expected, actual) = regressions({}, {"milestone.1000000_s": 800}, tolerance=0.2)["milestone.1000000_s"]
+    assert expected == 800
+    assert math.isnan(actual)
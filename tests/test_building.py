@@ -0,0 +1,81 @@
+"""Tests for ``src/building.py``."""
+import asyncio
+
+import pytest
+import pytest_mock
+
+from src.building import Building, BuildingRegistry
+from src.state import ProductState
+
+
+@pytest.fixture
+def products() -> list[ProductState]:
+    """Returns a store with two unlocked buildings."""
+    return [ProductState(id=0, price=15, owned=1), ProductState(id=1, price=100, owned=0)]
+
+
+@pytest.fixture
+def read_all(mocker: pytest_mock.MockerFixture) -> pytest_mock.MockType:
+    """Mocks :meth:`.Building.read_all`, so it doesn't need a backend."""
+
+    async def fake_read_all(backend: object, products: list[ProductState]) -> list[Building]:
+        return [Building(id=product.id, produces=0.1, costs=product.price) for product in products]
+
+    return mocker.patch("src.building.Building.read_all", side_effect=fake_read_all)
+
+
+async def _sync(registry: BuildingRegistry, products: list[ProductState]) -> list[Building]:
+    return await registry.sync(None, products)  # type: ignore[arg-type] # backend is not used, as `read_all` is mocked
+
+
+def test_first_sync_reads_buildings(products: list[ProductState], read_all: pytest_mock.MockType) -> None:
+    """Tests that the first ``sync`` reads buildings from the backend."""
+    buildings = asyncio.run(_sync(BuildingRegistry(), products))
+    assert [building.id for building in buildings] == [0, 1]
+    read_all.assert_called_once()
+
+
+def test_predicted_purchase_doesnt_read_again(products: list[ProductState], read_all: pytest_mock.MockType) -> None:
+    """Tests that a correctly predicted purchase doesn't cause re-reading buildings."""
+    registry = BuildingRegistry()
+    cursor = asyncio.run(_sync(registry, products))[0]
+    registry.record_purchase(cursor)
+    assert cursor.costs == 18  # ceil(15 * 1.15)
+
+    asyncio.run(_sync(registry, [ProductState(id=0, price=18, owned=2), products[1]]))
+    read_all.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "new_products",
+    (
+        [ProductState(id=0, price=15, owned=1)],  # store layout has changed
+        [ProductState(id=0, price=15, owned=2), ProductState(id=1, price=100, owned=0)],  # owned has changed
+        [ProductState(id=0, price=30, owned=1), ProductState(id=1, price=100, owned=0)],  # price has drifted
+    ),
+)
+def test_changes_cause_revalidation(
+    products: list[ProductState], new_products: list[ProductState], read_all: pytest_mock.MockType
+) -> None:
+    """Tests that unexpected changes in the store cause re-reading buildings."""
+    registry = BuildingRegistry()
+    asyncio.run(_sync(registry, products))
+    assert registry.needs_revalidation(new_products)
+
+
+def test_invalidate(products: list[ProductState], read_all: pytest_mock.MockType) -> None:
+    """Tests that ``invalidate`` forces re-reading buildings."""
+    registry = BuildingRegistry()
+    asyncio.run(_sync(registry, products))
+    registry.invalidate()
+    asyncio.run(_sync(registry, products))
+    assert read_all.call_count == 2
+
+
+def test_read_all_parses_production(products: list[ProductState], mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that production of all buildings is read in one call, and parsed as the game shows it."""
+    backend = mocker.AsyncMock()
+    backend.read_building_production.return_value = ["1.5 million", None]
+    buildings = asyncio.run(Building.read_all(backend, products))
+    backend.read_building_production.assert_awaited_once_with([0, 1])
+    assert buildings == [Building(id=0, produces=1_500_000, costs=15), Building(id=1, produces=None, costs=100)]
@@ -0,0 +1,29 @@
+"""Tests for ``src/checkpoint.py``."""
+import pathlib
+import zlib
+
+from src.checkpoint import Checkpoints
+
+
+def test_read_what_was_written(tmp_path: pathlib.Path) -> None:
+    """Tests that the last written save is read back, and that it is compressed on disk."""
+    checkpoints = Checkpoints(tmp_path / "checkpoints" / "run.save")
+    assert checkpoints.read() is None
+
+    save = "Mi4wNTJ8fDE3MDA" * 100 + "!END!"
+    assert checkpoints.write(save)
+    assert checkpoints.read() == save
+    assert zlib.decompress(checkpoints.path.read_bytes()).decode() == save
+    assert checkpoints.path.stat().st_size < len(save)
+    assert Checkpoints(checkpoints.path).read() == save
+
+
+def test_write_only_changes(tmp_path: pathlib.Path) -> None:
+    """Tests that the same save is not written twice in a row."""
+    checkpoints = Checkpoints(tmp_path / "run.save")
+    assert checkpoints.write("first")
+    assert not checkpoints.write("first")
+    assert checkpoints.write("second")
+    assert checkpoints.write("first")
+    assert checkpoints.read() == "first"
+    assert list(tmp_path.iterdir()) == [checkpoints.path]  # no temporary files are left behind
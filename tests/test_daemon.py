@@ -0,0 +1,157 @@
+"""Tests for ``src/daemon.py``."""
+import asyncio
+import unittest.mock
+
+import pytest_mock
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.backend.playwright import PlaywrightBackend
+from src.daemon import BrowserPool, PoolServer
+from src.metrics import Metrics
+
+
+def test_lease_and_release(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that a leased game is replaced right away, and that a released game is closed, not reused."""
+    games = []
+
+    async def fake_open(*args: object, **kwargs: object) -> unittest.mock.AsyncMock:
+        game: unittest.mock.AsyncMock = mocker.AsyncMock(seeded=True)
+        games.append(game)
+        return game
+
+    mocker.patch("src.daemon.PlaywrightBackend.open", side_effect=fake_open)
+
+    async def run() -> None:
+        pool = BrowserPool(mocker.Mock(), "http://127.0.0.1:9222", size=2)
+        await pool.start()
+        async with TestClient(TestServer(PoolServer(pool).app)) as client:
+            response = await client.post("/lease")
+            lease = await response.json()
+            assert lease["cdp"] == "http://127.0.0.1:9222"
+            assert lease["seeded"]
+            await asyncio.sleep(0)  # let the replacement load
+            assert (await (await client.get("/status")).json()) == {"ready": 2, "leased": 1}
+
+            assert (await client.post(f"/release/{lease['id']}")).status == 204
+            assert (await client.post(f"/release/{lease['id']}")).status == 404
+            await asyncio.sleep(0)
+            assert (await (await client.get("/status")).json()) == {"ready": 2, "leased": 0}
+        await pool.stop()
+
+        assert len(games) == 3
+        [released] = [game for game in games if game.close.await_count]
+        # the page is found by its lease ID
+        released.page.evaluate.assert_awaited_once_with(mocker.ANY, lease["id"])
+
+    asyncio.run(run())
+
+
+def test_failed_load_is_retried(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that a game, which failed to load, is loaded again, so the pool doesn't shrink."""
+    mocker.patch("src.daemon.LOAD_RETRY_DELAY", 0)
+    mocker.patch("src.daemon.PlaywrightBackend.open", side_effect=[RuntimeError("crashed"), mocker.AsyncMock()])
+
+    async def run() -> None:
+        pool = BrowserPool(mocker.Mock(), "http://127.0.0.1:9222", size=1)
+        await pool.start()
+        await asyncio.wait_for(pool.lease(), timeout=1)
+        await pool.stop()
+
+    asyncio.run(run())
+
+
+def test_lease_fails_without_ready_games(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that a lease doesn't wait forever, if no game can be loaded."""
+    mocker.patch("src.daemon.LEASE_TIMEOUT", 0.01)
+    mocker.patch("src.daemon.PlaywrightBackend.open", side_effect=RuntimeError("crashed"))
+
+    async def run() -> None:
+        pool = BrowserPool(mocker.Mock(), "http://127.0.0.1:9222", size=1)
+        await pool.start()
+        async with TestClient(TestServer(PoolServer(pool).app)) as client:
+            assert (await client.post("/lease")).status == 503
+        await pool.stop()
+
+    asyncio.run(run())
+
+
+def test_lease_expires_unless_renewed(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that an abandoned lease is released, and that a game, which can't be closed, doesn't break that."""
+    now = 0.0
+    game = mocker.AsyncMock()
+    game.close.side_effect = RuntimeError("Target page, context or browser has been closed")
+    mocker.patch("src.daemon.PlaywrightBackend.open", return_value=game)
+    warning = mocker.patch("src.daemon.logger.warning")
+
+    async def run() -> None:
+        nonlocal now
+        pool = BrowserPool(mocker.Mock(), "http://127.0.0.1:9222", size=1, lease_ttl=60, clock=lambda: now)
+        await pool.start()
+        id, _ = await pool.lease()
+
+        now = 50
+        pool.renew(id)
+        now = 100
+        await pool.expire()
+        assert pool.leased == 1
+
+        now = 110
+        await pool.expire()
+        assert pool.leased == 0
+        await asyncio.sleep(0)  # let it close
+        await pool.stop()
+
+    asyncio.run(run())
+    game.close.assert_awaited_once()
+    assert "has failed" in warning.call_args.args[0]
+
+
+def test_games_are_configured_without_preset(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that without a preset every game is configured before it's leased, like ``launch`` does."""
+    game: unittest.mock.AsyncMock = mocker.AsyncMock(seeded=False)
+    mocker.patch("src.daemon.PlaywrightBackend.open", return_value=game)
+
+    async def run() -> None:
+        pool = BrowserPool(mocker.Mock(), "http://127.0.0.1:9222", size=1)
+        await pool.start()
+        _, backend = await pool.lease()
+        assert backend.seeded
+        await pool.stop()
+
+    asyncio.run(run())
+    game.prepare.assert_awaited()
+
+
+def test_attached_game_renews_its_lease(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that a client keeps its lease alive, and reports how that goes in metrics."""
+    pages: list[unittest.mock.Mock] = []
+
+    async def fake_open(*args: object, **kwargs: object) -> unittest.mock.AsyncMock:
+        page = mocker.Mock(url="")
+        # the page is found by its lease ID in the URL, which the pool puts there
+        page.evaluate = mocker.AsyncMock(side_effect=lambda script, id: setattr(page, "url", f"http://game/#{id}"))
+        pages.append(page)
+        game: unittest.mock.AsyncMock = mocker.AsyncMock(seeded=True, page=page)
+        return game
+
+    mocker.patch("src.daemon.PlaywrightBackend.open", side_effect=fake_open)
+    playwright = mocker.patch("src.backend.playwright.async_playwright").return_value.__aenter__.return_value
+    playwright.chromium.connect_over_cdp = mocker.AsyncMock()
+    playwright.chromium.connect_over_cdp.return_value.contexts = [mocker.Mock(pages=pages)]
+    metrics = Metrics()
+
+    async def run() -> None:
+        pool = BrowserPool(mocker.Mock(), "http://127.0.0.1:9222", size=1, lease_ttl=0.03)
+        renew = mocker.spy(pool, "renew")
+        await pool.start()
+        async with TestServer(PoolServer(pool).app) as server:
+            async with PlaywrightBackend.attach(str(server.make_url("")), metrics) as backend:
+                assert backend.leased
+                await asyncio.sleep(0.05)
+            assert renew.call_count >= 2
+            assert pool.leased == 0
+        await pool.stop()
+
+    asyncio.run(run())
+    assert metrics.gauges["task_renew_lease_up"] == 0  # stopped after the release
+    assert not metrics.counters["task_renew_lease_failures"]
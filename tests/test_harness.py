@@ -0,0 +1,42 @@
+"""Tests for ``src/harness.py``."""
+import asyncio
+
+import pytest
+import pytest_mock
+
+from src.backend.memory import InMemoryBackend
+from src.harness import Distribution, RunResult, play, simulate
+from src.logic.all import AllLogic
+from src.simulator import Simulator
+
+
+def test_distribution() -> None:
+    """Tests that the distribution is computed regardless of order of runs."""
+    results = [RunResult(seed=i, seconds=seconds, golden_cookies=0) for i, seconds in enumerate((30, 10, 20, 40))]
+    assert Distribution.of(results) == Distribution(runs=4, median=25, p90=40, worst=40)
+
+
+def test_simulate_is_reproducible() -> None:
+    """Tests that a simulated run depends only on its seed, so strategies can be compared on the same seeds."""
+    first = simulate(seed=1, target=50_000, target_cps=50)
+    assert first == simulate(seed=1, target=50_000, target_cps=50)
+    assert first.seconds > 0
+
+
+def test_simulate_records_health() -> None:
+    """Tests that memory usage is put into metrics, so leaks on long runs are visible."""
+    result = simulate(seed=1, target=1_000, target_cps=50)
+    assert result.metrics["python_rss_bytes"] > 0
+
+
+def test_play_stops_on_failure(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that a failed run doesn't leave anything running in the background."""
+    mocker.patch("src.logic.all.AllLogic.run", side_effect=RuntimeError("the page has crashed"))
+
+    async def run() -> set[asyncio.Task[object]]:
+        logic = AllLogic(InMemoryBackend(Simulator(seed=1)))
+        with pytest.raises(RuntimeError):
+            await play(logic, target=1_000, target_cps=50)
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert asyncio.run(run()) == set()
@@ -0,0 +1,79 @@
+"""Tests for ``src/logging.py``."""
+import json
+import pathlib
+import typing as t
+
+import pytest
+from loguru import logger
+
+from src.logging import (
+    FirstOccurrence,
+    LoggingLevel,
+    Sampler,
+    compact_json,
+    setup_logging,
+)
+
+
+@pytest.fixture
+def messages() -> t.Iterator[list[str]]:
+    result: list[str] = []
+    logger.remove()
+    yield result
+    logger.remove()
+
+
+def test_sampler(messages: list[str]) -> None:
+    """Tests that one line of code can't flood the output, and that dropped messages are counted."""
+    now = 0.0
+    logger.add(messages.append, format="{message}", filter=Sampler(burst=2, period=1, clock=lambda: now))
+    for i in range(6):
+        if i == 5:
+            now = 1.0
+        logger.info("tick {}", i)
+    assert messages == ["tick 0\n", "tick 1\n", "tick 5 (3 similar messages dropped)\n"]
+
+
+def test_first_occurrence(messages: list[str]) -> None:
+    """Tests that only the first occurrence of an error is recognized as such."""
+    first_occurrence = FirstOccurrence()
+    logger.add(messages.append, format="{message}", filter=first_occurrence)
+
+    for i in range(3):
+        try:
+            raise RuntimeError(i)
+        except RuntimeError:
+            logger.exception("failed {}", i)
+    try:
+        raise KeyError("missing")
+    except KeyError:
+        logger.exception("other error")
+    logger.error("no exception at all")
+
+    assert [message.splitlines()[0] for message in messages] == ["failed 0", "other error"]
+
+
+def test_compact_json(messages: list[str]) -> None:
+    """Tests that every message is one JSON object on one line."""
+    logger.add(messages.append, format=compact_json)
+    try:
+        raise ValueError("bad")
+    except ValueError:
+        logger.exception("it has failed")
+
+    [line] = messages
+    entry = json.loads(line)
+    assert entry["level"] == "ERROR"
+    assert entry["message"] == "it has failed"
+    assert entry["exception"] == "ValueError('bad')"
+
+
+def test_setup_logging_writes_file(tmp_path: pathlib.Path) -> None:
+    """Tests that the file sink gets messages, once the queue is flushed."""
+    log_file = tmp_path / "run.jsonl"
+    setup_logging(LoggingLevel.WARNING, log_file)
+    logger.warning("careful")
+    logger.complete()
+    logger.remove()
+
+    assert [json.loads(line)["message"] for line in log_file.read_text().splitlines()] == ["careful"]
@@ -0,0 +1,47 @@
+"""Tests for ``src/metrics.py``."""
+import pytest
+
+from src.metrics import Metrics
+
+
+def test_phases_can_be_nested() -> None:
+    """Tests that nested phases are measured separately, and the innermost one is the current one."""
+    metrics = Metrics()
+    with metrics.phase("make_purchases"):
+        with metrics.phase("plan"):
+            inner = metrics.current_phase
+        outer = metrics.current_phase
+    assert (inner, outer, metrics.current_phase) == ("plan", "make_purchases", None)
+    assert metrics.phases["make_purchases"].count == metrics.phases["plan"].count == 1
+
+
+def test_phase_is_recorded_on_error() -> None:
+    """Tests that a failed phase is still measured, and doesn't stay current."""
+    metrics = Metrics()
+    with pytest.raises(ValueError), metrics.phase("update_state"):
+        raise ValueError
+    assert metrics.phases["update_state"].count == 1
+    assert metrics.current_phase is None
+
+
+def test_milestones_are_relative_to_the_first_balance() -> None:
+    """Tests that milestones are recorded once, in seconds since the first recorded balance."""
+    metrics = Metrics()
+    metrics.reach(0, now=100)
+    metrics.reach(5_000, now=110)
+    metrics.reach(20_000, now=130)
+    metrics.reach(15_000, now=140)  # we spent some, this is not a new milestone
+    assert metrics.milestones == {1_000: 10, 10_000: 30}
+
+
+def test_snapshot() -> None:
+    """Tests that snapshot contains round trips per tick and all phases."""
+    metrics = Metrics()
+    with metrics.phase("plan"):
+        pass
+    metrics.tick(round_trips=3)
+    metrics.tick(round_trips=4)
+    snapshot = metrics.snapshot()
+    assert snapshot["ticks"] == 2
+    assert snapshot["round_trips_per_tick"] == 2
+    assert {"phase.plan.mean_ms", "phase.plan.p90_ms", "phase.plan.max_ms"} <= snapshot.keys()
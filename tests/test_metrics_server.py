@@ -0,0 +1,47 @@
+"""Tests for ``src/metrics_server.py``."""
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.metrics import Metrics
+from src.metrics_server import MetricsServer
+
+
+def _get(metrics: Metrics, path: str) -> tuple[str, str]:
+    """Returns content type and body of a response from the server."""
+
+    async def run() -> tuple[str, str]:
+        async with TestClient(TestServer(MetricsServer(metrics).app)) as client:
+            response = await client.get(path)
+            assert response.status == 200
+            return response.content_type, await response.text()
+
+    return asyncio.run(run())
+
+
+def _metrics() -> Metrics:
+    metrics = Metrics()
+    with metrics.phase("plan"):
+        pass
+    metrics.count("golden_cookies_caught", 2)
+    metrics.gauges["balance"] = 123
+    metrics.tick(round_trips=5)
+    return metrics
+
+
+def test_prometheus() -> None:
+    """Tests that ``/metrics`` contains a histogram of phases, counters and gauges."""
+    content_type, body = _get(_metrics(), "/metrics")
+    assert content_type == "text/plain"
+    assert 'cookieclicker_phase_seconds_bucket{phase="plan",le="+Inf"} 1' in body
+    assert 'cookieclicker_phase_seconds_count{phase="plan"} 1' in body
+    assert "cookieclicker_golden_cookies_caught_total 2" in body
+    assert "cookieclicker_round_trips_total 5" in body
+    assert "cookieclicker_balance 123" in body
+
+
+def test_json() -> None:
+    """Tests that ``/metrics.json`` is the snapshot of metrics."""
+    content_type, body = _get(_metrics(), "/metrics.json")
+    assert content_type == "application/json"
+    assert '"golden_cookies_caught": 2' in body
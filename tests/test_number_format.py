@@ -0,0 +1,51 @@
+"""Tests for ``src/number_format.py``."""
+import math
+
+import pytest
+
+from src.number_format import SUFFIXES, parse_number
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    (
+        ("15", 15),
+        ("1,234,567", 1_234_567),
+        ("0.1", 0.1),
+        (" 1.5 ", 1.5),  # e.g. after "per second:"
+        ("1 cookie", 1),
+        ("0.1 cookies", 0.1),
+        ("1.500 million", 1_500_000),
+        ("1.500 millioncookies", 1_500_000),  # balance, when there is a line break before "cookies"
+        ("12.345 billion cookies", 12_345_000_000),
+        ("1 quadrillion", 1e15),
+        ("2 nonillion", 2e30),
+        ("1 decillion", 1e33),
+        ("1 quattuorvigintillion", 1e75),
+        ("1 novemnonagintillion", 1e300),
+        ("1.5M", 1_500_000),
+        ("2Qa", 2e15),
+        ("3 Dc", 3e33),
+        ("1 T", 1e93),  # trigintillion, not trillion
+        ("1T", 1e12),
+        ("5.6e+21", 5.6e21),
+        ("Infinity", math.inf),
+    ),
+)
+def test_parse_number(text: str, expected: float) -> None:
+    """Tests that all formats, that the game uses, are parsed."""
+    assert parse_number(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", ("", "cookies", "1.5 gazillion", "one"))
+def test_not_a_number(text: str) -> None:
+    """Tests that what is not a number is an error, and not some random number."""
+    with pytest.raises(ValueError):
+        parse_number(text)
+
+
+def test_every_magnitude_is_covered() -> None:
+    """Tests that long and short formats cover every power of thousand, up to what the game can show."""
+    long = sorted({multiplier for suffix, multiplier in SUFFIXES.items() if suffix.endswith(("illion", "thousand"))})
+    assert long == [10.0 ** (3 * i) for i in range(1, len(long) + 1)]
+    assert long[-1] == 1e300
@@ -0,0 +1,57 @@
+"""Tests for ``src/planner.py``."""
+import pytest
+
+from src import planner
+from src.building import Building
+from src.upgrade import Upgrade
+
+
+def test_estimate_production() -> None:
+    """Tests that unbought buildings are estimated to produce 10 times more than the previous one."""
+    buildings = [Building(0, 0.1, 15), Building(1, None, 100), Building(2, None, 1100)]
+    assert planner.estimate_production(buildings) == pytest.approx([0.1, 1, 10])
+
+
+def test_plan_without_production() -> None:
+    """Tests that a building, which produces nothing right now (e.g. during a debuff), doesn't break planning."""
+    buildings = [Building(0, 0.0, 15), Building(1, None, 100)]
+    assert planner.estimate_production(buildings) == pytest.approx([planner.MIN_CPS, planner.MIN_CPS * 10])
+    plan = planner.plan(buildings, [], balance=10, cps=0)
+    assert len(plan) == planner.HORIZON
+
+
+def test_buys_first_building_if_nothing_is_known() -> None:
+    """Tests that we buy the first building, if we don't know how much anything produces."""
+    buildings = [Building(0, None, 15), Building(1, None, 100)]
+    plan = planner.plan(buildings, [], balance=0, cps=1)
+    assert [step.target for step in plan] == [buildings[0]]
+
+
+def test_plan_prefers_best_payback() -> None:
+    """Tests that building, which pays for itself faster, goes first."""
+    cheap, efficient = Building(0, 0.1, 15), Building(1, 1, 100)
+    plan = planner.plan([cheap, efficient], [], balance=1000, cps=10, steps=1)
+    assert plan[0].target is efficient
+
+
+def test_plan_predicts_growing_prices() -> None:
+    """Tests that planning the same building again uses its next price."""
+    building = Building(0, 1, 100)
+    plan = planner.plan([building], [], balance=0, cps=10, steps=3)
+    assert [step.price for step in plan] == pytest.approx([100, 115, 132.25])
+    assert [step.at for step in plan] == sorted(step.at for step in plan)
+    assert building.costs == 100  # planning must not modify buildings
+
+
+def test_plan_mixes_upgrades() -> None:
+    """Tests that cheap upgrades are planned together with buildings."""
+    plan = planner.plan([Building(0, 1, 1000)], [Upgrade("a", "upgrade0", 10)], balance=0, cps=10, steps=2)
+    assert isinstance(plan[0].target, Upgrade)
+    assert isinstance(plan[1].target, Building)
+
+
+def test_plan_stops_when_nothing_left() -> None:
+    """Tests that the plan is shorter than horizon, if there is nothing else to buy."""
+    assert planner.plan([], [Upgrade("a", "upgrade0", 10)], balance=0, cps=10, steps=5) == [
+        planner.PlannedPurchase(Upgrade("a", "upgrade0", 10), 10, 1)
+    ]
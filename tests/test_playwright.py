@@ -0,0 +1,90 @@
+"""Tests for ``src/backend/playwright.py``."""
+import asyncio
+import pathlib
+import unittest.mock
+
+import pytest
+import pytest_mock
+
+from src.backend.playwright import PlaywrightBackend
+from src.logic.all import AllLogic
+
+
+@pytest.fixture
+def browser(mocker: pytest_mock.MockerFixture) -> unittest.mock.AsyncMock:
+    """Returns a browser, whose pages have the game loaded right away."""
+    browser: unittest.mock.AsyncMock = mocker.AsyncMock()
+    page = browser.new_context.return_value.new_page.return_value
+    page.text_content.return_value = "v. 2.052"
+    page.keyboard = mocker.AsyncMock()
+    return browser
+
+
+@pytest.fixture
+def seed(mocker: pytest_mock.MockerFixture) -> pytest_mock.MockType:
+    """Mocks :meth:`.PlaywrightBackend.seed`, to see which save the game boots from."""
+    return mocker.patch("src.backend.playwright.PlaywrightBackend.seed")
+
+
+@pytest.fixture
+def preset(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Returns a path to a preset, that doesn't exist yet."""
+    return tmp_path / "presets" / "preset.save"
+
+
+def test_boots_from_preset(browser: unittest.mock.AsyncMock, seed: pytest_mock.MockType, preset: pathlib.Path) -> None:
+    """Tests that an existing preset is loaded before the game boots, so it doesn't need to be configured."""
+    preset.parent.mkdir()
+    preset.write_text("preset")
+    backend = asyncio.run(PlaywrightBackend.open(browser, preset=preset))
+    assert backend.seeded
+    seed.assert_awaited_once_with(backend.page, "preset")
+
+
+def test_checkpoint_wins_over_preset(
+    browser: unittest.mock.AsyncMock, seed: pytest_mock.MockType, preset: pathlib.Path
+) -> None:
+    """Tests that an explicit save (e.g. a checkpoint) is loaded instead of the preset."""
+    preset.parent.mkdir()
+    preset.write_text("preset")
+    backend = asyncio.run(PlaywrightBackend.open(browser, preset=preset, save="checkpoint"))
+    seed.assert_awaited_once_with(backend.page, "checkpoint")
+
+
+def test_missing_preset_is_created(
+    browser: unittest.mock.AsyncMock, seed: pytest_mock.MockType, preset: pathlib.Path
+) -> None:
+    """Tests that without a preset the game is configured by hand, and then saved as the preset."""
+    page = browser.new_context.return_value.new_page.return_value
+    page.wait_for_function.return_value.json_value.return_value = "configured"
+
+    async def run() -> PlaywrightBackend:
+        backend = await PlaywrightBackend.open(browser, preset=preset)
+        await backend.prepare()
+        return backend
+
+    backend = asyncio.run(run())
+    assert not backend.seeded
+    seed.assert_not_awaited()
+    assert preset.read_text() == "configured"
+
+
+def test_leased_game_isnt_restarted(browser: unittest.mock.AsyncMock) -> None:
+    """Tests that a game leased from the daemon is not closed and replaced behind the daemon's back."""
+    page = browser.new_context.return_value.new_page.return_value
+    backend = PlaywrightBackend(browser, page, leased=True)
+    with pytest.raises(RuntimeError):
+        asyncio.run(backend.restart("save"))
+    page.context.close.assert_not_awaited()
+    browser.new_context.assert_not_awaited()
+
+
+def test_daemon_cant_continue_from_save() -> None:
+    """Tests that a save isn't silently ignored, when the game is leased from the daemon."""
+
+    async def init() -> None:
+        async with AllLogic.init(daemon="http://127.0.0.1:9300", save="save"):
+            pass
+
+    with pytest.raises(ValueError):
+        asyncio.run(init())
@@ -0,0 +1,76 @@
+"""Tests for ``src/profiler.py``."""
+import asyncio
+import pathlib
+import time
+
+import pytest_mock
+
+from src.metrics import Metrics
+from src.profiler import Profiler
+
+
+def test_python_samples_are_tagged_by_phase(tmp_path: pathlib.Path) -> None:
+    """Tests that Python stacks are saved in folded format, under the phase that was running."""
+    output = tmp_path / "profile.folded"
+
+    async def run() -> None:
+        metrics = Metrics()
+        profiler = Profiler(metrics, output, interval=0.001)
+        await profiler.start()
+        with metrics.phase("plan"):
+            end = time.perf_counter() + 0.1
+            while time.perf_counter() < end:
+                pass
+        await profiler.stop()
+
+    asyncio.run(run())
+    lines = output.read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.startswith("plan;python;MainThread;")
+    assert "test_profiler:test_python_samples_are_tagged_by_phase.<locals>.run" in stack
+
+
+def test_profile_is_saved_after_crash(tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that Python samples are saved, even if the page has crashed, and its profile is lost."""
+    output = tmp_path / "profile.folded"
+    page = mocker.Mock()
+    session = page.context.new_cdp_session = mocker.AsyncMock()
+    session.return_value.send.side_effect = [None, None, None, RuntimeError("Target crashed")]
+
+    async def run() -> None:
+        profiler = Profiler(Metrics(), output, page, interval=0.001)
+        await profiler.start()
+        await asyncio.sleep(0.05)
+        await profiler.stop()
+
+    asyncio.run(run())
+    assert output.read_text()
+
+
+def test_js_samples_are_aligned_to_phases(tmp_path: pathlib.Path) -> None:
+    """Tests that samples of a JS profile are attributed to the phase, that was running at their time."""
+    profiler = Profiler(Metrics(), tmp_path / "profile.folded")
+    profiler._timeline = [(10.0, "idle"), (10.5, "update_state"), (11.0, "idle")]
+    profiler._js_started = 10.0
+    profiler._add_js_profile(
+        {
+            "nodes": [
+                {"id": 1, "callFrame": {"functionName": "(root)", "url": "", "lineNumber": -1}, "children": [2]},
+                {
+                    "id": 2,
+                    "callFrame": {"functionName": "Logic", "url": "https://example.com/main.js", "lineNumber": 9},
+                    "children": [3],
+                },
+                {"id": 3, "callFrame": {"functionName": "", "url": "", "lineNumber": -1}},
+            ],
+            "startTime": 5_000_000,  # Chrome's clock is 5 seconds behind ours
+            "samples": [2, 3, 3],
+            "timeDeltas": [100_000, 500_000, 100_000],
+        }
+    )
+    assert profiler.stacks == {
+        "idle;js;Logic (main.js:10)": 1,
+        "update_state;js;Logic (main.js:10);(anonymous)": 2,
+    }
@@ -0,0 +1,127 @@
+"""Tests for ``src/route.py``."""
+import asyncio
+import pathlib
+
+import pytest
+
+from src.backend.memory import InMemoryBackend
+from src.logic.all import AllLogic
+from src.route import (
+    MAGIC,
+    ROW,
+    Kind,
+    RouteRecorder,
+    RouteStep,
+    convert,
+    read_route,
+)
+from src.simulator import Simulator
+
+STEPS = [
+    RouteStep(at=1.5, kind=Kind.BUILDING, target=0, price=15, balance=16, cps=0.5),
+    RouteStep(at=30, kind=Kind.UPGRADE, target="Reinforced index finger", price=100, balance=120, cps=3),
+]
+
+
+def _record(path: pathlib.Path, steps: list[RouteStep]) -> None:
+    recorder = RouteRecorder(path)
+    for step in steps:
+        recorder.record(step)
+    recorder.close()
+
+
+def test_binary_roundtrip(tmp_path: pathlib.Path) -> None:
+    """Tests that recorded steps are read back, and that the file is appended to."""
+    path = tmp_path / "run.route"
+    _record(path, STEPS[:1])
+    _record(path, STEPS[1:])
+    assert read_route(path) == STEPS
+    assert path.stat().st_size == len(MAGIC) + 2 * ROW.size + len("0Reinforced index finger")
+
+
+def test_cut_row_is_ignored(tmp_path: pathlib.Path) -> None:
+    """Tests that a row, which was cut by a crash, doesn't break reading the rest."""
+    path = tmp_path / "run.route"
+    _record(path, STEPS)
+    path.write_bytes(path.read_bytes()[:-3])
+    assert read_route(path) == STEPS[:1]
+
+
+def test_not_a_route(tmp_path: pathlib.Path) -> None:
+    """Tests that reading something else is an error."""
+    path = tmp_path / "run.route"
+    path.write_bytes(b"something else")
+    with pytest.raises(ValueError):
+        read_route(path)
+
+
+def test_csv_roundtrip(tmp_path: pathlib.Path) -> None:
+    """Tests that a route can be converted to CSV (e.g. to edit it) and back."""
+    _record(tmp_path / "run.route", STEPS)
+    convert(tmp_path / "run.route", tmp_path / "run.csv")
+    assert "building,0," in (tmp_path / "run.csv").read_text()
+    assert "upgrade,Reinforced index finger," in (tmp_path / "run.csv").read_text()
+    convert(tmp_path / "run.csv", tmp_path / "edited.route")
+    assert read_route(tmp_path / "edited.route") == STEPS
+
+
+def test_replay_repeats_recorded_run(tmp_path: pathlib.Path) -> None:
+    """Tests that replaying a recorded run on the same seed makes the same purchases, with the same timing."""
+    path = tmp_path / "run.route"
+
+    async def play(replay: list[RouteStep] | None, record: pathlib.Path) -> Simulator:
+        simulator = Simulator(seed=0)
+        logic = AllLogic(InMemoryBackend(simulator))
+        logic.recorder = RouteRecorder(record)
+        await logic.setup(target_cps=50, golden_cookie_observer=True)
+        if replay is not None:
+            await logic.replay(replay)
+        else:
+            await logic.run(20_000)
+        await logic.stop()
+        logic.recorder.close()
+        return simulator
+
+    recorded = asyncio.run(play(None, path))
+    replayed = asyncio.run(play(read_route(path), tmp_path / "replay.route"))
+    assert replayed.owned == recorded.owned
+    assert replayed.bought_upgrades == recorded.bought_upgrades
+    original, replay = read_route(path), read_route(tmp_path / "replay.route")
+    assert [(step.kind, step.target) for step in replay] == [(step.kind, step.target) for step in original]
+    assert original[-1].at <= replay[-1].at <= original[-1].at + 1
+
+
+def test_replay_skips_missing_steps() -> None:
+    """Tests that a step, which never appears in the store, is skipped, and the rest of the route is replayed."""
+
+    async def replay() -> Simulator:
+        simulator = Simulator(seed=0)
+        logic = AllLogic(InMemoryBackend(simulator))
+        await logic.setup(target_cps=50)
+        await logic.replay(
+            [
+                RouteStep(at=1, kind=Kind.UPGRADE, target="No such upgrade", price=1, balance=1, cps=0),
+                STEPS[0],
+            ]
+        )
+        await logic.stop()
+        return simulator
+
+    simulator = asyncio.run(asyncio.wait_for(replay(), timeout=10))
+    assert simulator.owned[0] == 1
+
+
+def test_replay_keeps_recorded_timing(tmp_path: pathlib.Path) -> None:
+    """Tests that a purchase is not replayed earlier, than it was made in the recorded run."""
+
+    async def replay() -> None:
+        logic = AllLogic(InMemoryBackend(Simulator(seed=0)))
+        logic.recorder = RouteRecorder(tmp_path / "replay.route")
+        await logic.setup(target_cps=50)
+        await logic.replay([RouteStep(at=60, kind=Kind.BUILDING, target=0, price=15, balance=15, cps=0)])
+        await logic.stop()
+        logic.recorder.close()
+
+    asyncio.run(replay())
+    [step] = read_route(tmp_path / "replay.route")
+    assert 60 <= step.at <= 61
@@ -0,0 +1,42 @@
+"""Tests for ``src/backend/routing.py``."""
+import pathlib
+
+import pytest
+
+from src.backend.routing import GAME_URL, is_allowed, mirror_path
+
+
+@pytest.mark.parametrize(
+    ("url", "resource_type", "expected"),
+    (
+        (GAME_URL, "document", True),
+        (GAME_URL + "main.js?v=2.052", "script", True),
+        (GAME_URL + "img/perfectCookie.png", "image", True),
+        (GAME_URL + "snd/tick.mp3", "media", False),  # audio
+        ("https://fonts.googleapis.com/css?family=Kavoon", "stylesheet", False),
+        ("https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js", "script", False),
+        ("https://www.google-analytics.com/analytics.js", "script", False),
+        (GAME_URL + "patreon/grab.php", "xhr", False),
+    ),
+)
+def test_is_allowed(url: str, resource_type: str, expected: bool) -> None:
+    """Tests that only the game itself is allowed to be downloaded."""
+    assert is_allowed(url, resource_type) is expected
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    (
+        (GAME_URL, "index.html"),
+        (GAME_URL + "main.js?v=2.052", "main.js"),
+        (GAME_URL + "loc/EN.js", "loc/EN.js"),
+    ),
+)
+def test_mirror_path(tmp_path: pathlib.Path, url: str, expected: str) -> None:
+    """Tests that files of the game are stored under their path, without the query."""
+    assert mirror_path(tmp_path, url) == (tmp_path / expected).resolve()
+
+
+def test_mirror_path_doesnt_escape_mirror(tmp_path: pathlib.Path) -> None:
+    """Tests that a URL can't make us write outside of the mirror."""
+    assert mirror_path(tmp_path, GAME_URL + "../../etc/passwd") is None
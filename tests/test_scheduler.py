@@ -0,0 +1,35 @@
+"""Tests for ``src/scheduler.py``."""
+import asyncio
+import time
+
+import pytest
+
+from src.scheduler import TickScheduler
+
+
+@pytest.mark.parametrize(
+    ("balance", "cps", "next_price", "expected"),
+    (
+        (0, 10, 20, 2),  # wait until we can afford it
+        (100, 10, 20, 0.05),  # can afford it already
+        (0, 1, 1_000_000, 5),  # too long, we should still look around from time to time
+        (0, 0, 20, 5),  # we produce nothing
+        (0, 10, None, 5),  # nothing to buy
+    ),
+)
+def test_delay(balance: float, cps: float, next_price: float | None, expected: float) -> None:
+    """Tests that ``delay`` waits until the next purchase is affordable, but stays in bounds."""
+    assert TickScheduler(min_delay=0.05, max_delay=5).delay(balance, cps, next_price) == pytest.approx(expected)
+
+
+def test_wake_interrupts_sleep() -> None:
+    """Tests that ``wake`` ends ``sleep`` early."""
+
+    async def run() -> float:
+        scheduler = TickScheduler()
+        asyncio.get_running_loop().call_later(0.01, scheduler.wake)
+        start = time.perf_counter()
+        await scheduler.sleep(10)
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) < 1
@@ -0,0 +1,100 @@
+"""Tests for ``src/simulator.py``."""
+import math
+
+import pytest
+
+from src.simulator import BUILDINGS, Simulator
+from src.state import GameState
+
+
+def test_price_grows() -> None:
+    """Tests that each bought building makes the next one 15% more expensive."""
+    simulator = Simulator(seed=0)
+    simulator.cookies = simulator.earned = 1000
+    assert simulator.price(0) == 15
+    assert simulator.buy_building(0)
+    assert simulator.price(0) == 18
+    assert simulator.cookies == 985
+
+
+def test_cant_buy_without_cookies() -> None:
+    """Tests that buying something we can't afford does nothing."""
+    simulator = Simulator(seed=0)
+    assert not simulator.buy_building(0)
+    assert simulator.owned[0] == 0
+
+
+def test_upgrade_doubles_production() -> None:
+    """Tests that tiered upgrades make a building twice as efficient."""
+    simulator = Simulator(seed=0)
+    simulator.cookies = simulator.earned = 10_000
+    simulator.buy_building(1)
+    cps = simulator.cps()
+    assert simulator.buy_upgrade("Grandma tier 1")
+    assert simulator.cps() == pytest.approx(cps * 2)
+
+
+def test_advance_produces_cookies() -> None:
+    """Tests that ``advance`` adds production and clicks."""
+    simulator = Simulator(seed=0, clicks_per_second=10)
+    simulator.advance(10)
+    assert simulator.cookies == pytest.approx(100)
+    assert simulator.handmade == pytest.approx(100)
+
+
+def test_save_and_load() -> None:
+    """Tests that a loaded save continues with the same buildings, upgrades and production."""
+    simulator = Simulator(seed=0)
+    simulator.cookies = simulator.earned = 10_000
+    simulator.buy_building(1)
+    simulator.buy_upgrade("Grandma tier 1")
+    simulator.advance(10)
+
+    loaded = Simulator.load(simulator.save())
+    assert (loaded.time, loaded.cookies, loaded.owned) == (simulator.time, simulator.cookies, simulator.owned)
+    assert loaded.bought_upgrades == simulator.bought_upgrades
+    assert loaded.cps() == simulator.cps()
+    assert loaded.available_upgrades() == simulator.available_upgrades()
+
+
+def test_golden_cookies_appear() -> None:
+    """Tests that golden cookies appear and can be collected, if not collected automatically."""
+    simulator = Simulator(seed=0, auto_collect_golden_cookies=False)
+    for _ in range(15 * 60):
+        simulator.advance(1)
+        if simulator.golden_cookie_on_screen:
+            break
+    assert simulator.golden_cookie_on_screen
+    assert simulator.collect_golden_cookie()
+    assert simulator.golden_cookies_collected == 1
+
+
+def test_run_reaches_target() -> None:
+    """Tests that the planner can play the simulator to the target."""
+    simulator = Simulator(seed=0)
+    simulator.run(target=100_000)
+    assert simulator.earned >= 100_000
+    assert sum(simulator.owned) > 0
+
+
+def test_nothing_is_produced() -> None:
+    """Tests that without any income, waiting takes forever instead of dividing by zero."""
+    simulator = Simulator(seed=1, clicks_per_second=0, auto_collect_golden_cookies=False)
+    assert simulator.time_until(100) == math.inf
+    assert simulator.run(target=100) == math.inf
+
+    # golden cookies still give something, so we get there eventually
+    simulator = Simulator(seed=1, clicks_per_second=0)
+    assert simulator.run(target=100) < math.inf
+    assert simulator.earned >= 100
+
+
+def test_snapshot_is_readable() -> None:
+    """Tests that ``snapshot`` can be applied to :class:`.GameState`, the same way as the page's one."""
+    simulator = Simulator(seed=0)
+    simulator.advance(100)
+    state = GameState.empty()
+    state.update(simulator.snapshot())
+    assert state.balance == int(simulator.cookies)
+    assert [product.id for product in state.products] == list(range(len(state.products)))
+    assert len(state.products) < len(BUILDINGS)
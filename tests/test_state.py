@@ -0,0 +1,101 @@
+"""Tests for ``src/state.py``."""
+import asyncio
+
+import pytest
+
+from src.backend.memory import InMemoryBackend
+from src.simulator import Simulator
+from src.state import GameState, ProductState, RateWindow, RawState, StateCache
+
+
+@pytest.fixture
+def snapshot() -> RawState:
+    """Returns a full snapshot, as ``snapshot.js`` would return it."""
+    return {
+        "balance": "1,234",
+        "cps": " 12.5",
+        "products": [{"id": 0, "price": "15", "owned": ""}],
+        "upgrades": [{"htmlId": "upgrade0", "key": "abc"}],
+        "upgradesVersion": 1,
+        "shimmers": 0,
+    }
+
+
+def test_update_applies_full_snapshot(snapshot: RawState) -> None:
+    """Tests that ``GameState.update`` parses a full snapshot."""
+    state = GameState.empty()
+    state.update(snapshot)
+    assert state.balance == 1234
+    assert state.cps == 12.5
+    assert state.products == [ProductState(id=0, price=15, owned=0)]
+    assert state.upgrades[0].key == "abc"
+
+
+def test_update_applies_delta(snapshot: RawState) -> None:
+    """Tests that ``GameState.update`` changes only keys, that are in the delta."""
+    state = GameState.empty()
+    state.update(snapshot)
+    state.update({"shimmers": 2})
+    assert state.shimmers == 2
+    assert state.balance == 1234
+
+
+def test_update_applies_simulator_snapshot() -> None:
+    """Tests that a snapshot of :class:`.InMemoryBackend` has every key of ``snapshot.js``, and is parsed the same."""
+    simulator = Simulator(seed=0)
+    simulator.cookies = simulator.earned = 1_000
+    simulator.buy_building(0)
+    raw = asyncio.run(InMemoryBackend(simulator).read_state())
+    assert set(raw) == set(RawState.__annotations__)
+
+    state = GameState.empty()
+    state.update(raw)
+    assert state.balance == 985
+    assert state.cps == pytest.approx(0.1)
+    assert state.products[0] == ProductState(id=0, price=simulator.price(0), owned=1)
+    assert [upgrade.key for upgrade in state.upgrades] == [upgrade.name for upgrade in simulator.available_upgrades()]
+    assert state.upgrades[0].html_id == "upgrade0"
+
+
+def test_rate_window_rate() -> None:
+    """Tests that ``RateWindow.rate`` returns produced cookies per second."""
+    window = RateWindow()
+    for second in range(5):
+        window.add(second, second * 10)
+    assert window.rate == 10
+
+
+def test_rate_window_survives_purchase() -> None:
+    """Tests that spending cookies doesn't break ``RateWindow.rate``."""
+    window = RateWindow()
+    for second in range(5):
+        window.add(second, second * 10)
+    window.add(5, 0)  # we spent everything
+    window.add(6, 10)
+    assert window.rate == 10
+
+
+def test_rate_window_forgets_old_samples() -> None:
+    """Tests that ``RateWindow`` counts only the last :attr:`.RateWindow.seconds`."""
+    window = RateWindow(seconds=2)
+    for second in range(5):
+        window.add(second, second * 10)
+    for second in range(5, 8):
+        window.add(second, 40 + (second - 4) * 100)
+    assert window.rate == 100
+
+
+def test_rate_window_same_timestamp() -> None:
+    """Tests that two samples at the same moment don't divide by zero."""
+    window = RateWindow()
+    window.add(1, 10)
+    window.add(1, 20)
+    assert window.rate == 0
+
+
+def test_state_cache_counts_production(snapshot: RawState) -> None:
+    """Tests that ``StateCache`` feeds balance to its :class:`.RateWindow`."""
+    cache = StateCache()
+    cache.apply(snapshot)
+    cache.apply({"balance": "2,000"})
+    assert cache.production.rate > 0
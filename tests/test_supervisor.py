@@ -0,0 +1,76 @@
+"""Tests for ``src/supervisor.py``."""
+import asyncio
+
+import pytest
+
+from src.metrics import Metrics
+from src.supervisor import TaskState, TaskSupervisor
+
+
+def test_backoff_and_circuit_breaker() -> None:
+    """Tests that a failing task is retried less and less often, and then paused, instead of flooding."""
+    attempts = 0
+
+    async def failing() -> None:
+        nonlocal attempts
+        attempts += 1
+        raise RuntimeError("page has been detached")
+
+    async def run() -> TaskSupervisor:
+        supervisor = TaskSupervisor(Metrics(), threshold=3, cooldown=10)
+        supervisor.every("failing", 0.01, failing)
+        await asyncio.sleep(0.2)  # 0.01 + 0.02, and then the circuit is open for much longer
+        await supervisor.shutdown()
+        return supervisor
+
+    supervisor = asyncio.run(run())
+    assert attempts == 3
+    assert supervisor.health["failing"].total_failures == 3
+    assert supervisor.health["failing"].last_error == "RuntimeError('page has been detached')"
+    assert supervisor.metrics is not None
+    assert supervisor.metrics.counters["task_failing_failures"] == 3
+
+
+def test_recovery() -> None:
+    """Tests that one success resets the task back to healthy."""
+    results = iter((False, False, True))
+
+    async def flaky() -> None:
+        if not next(results, True):
+            raise RuntimeError
+
+    async def run() -> tuple[TaskState, int]:
+        metrics = Metrics()
+        supervisor = TaskSupervisor(metrics)
+        supervisor.every("flaky", 0.01, flaky)
+        await asyncio.sleep(0.1)
+        health = supervisor.health["flaky"]
+        state, up = health.state, int(metrics.gauges["task_flaky_up"])
+        await supervisor.shutdown()
+        assert health.state is TaskState.STOPPED
+        return state, up
+
+    assert asyncio.run(run()) == (TaskState.RUNNING, 1)
+
+
+def test_shutdown_cancels_tasks() -> None:
+    """Tests that nothing keeps running after shutdown."""
+    steps = 0
+
+    async def step() -> None:
+        nonlocal steps
+        steps += 1
+
+    async def run() -> None:
+        supervisor = TaskSupervisor()
+        supervisor.every("step", 0.01, step)
+        with pytest.raises(ValueError):
+            supervisor.every("step", 0.01, step)
+        await asyncio.sleep(0.05)
+        await supervisor.shutdown()
+        stopped_at = steps
+        await asyncio.sleep(0.05)
+        assert steps == stopped_at
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(run())
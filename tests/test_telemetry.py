@@ -0,0 +1,38 @@
+"""Tests for ``src/telemetry.py`` and ``src/analysis.py``."""
+import pathlib
+
+import pytest
+
+from src.telemetry import HEADER, ROW, TelemetryRing
+
+
+def _fill(path: pathlib.Path, capacity: int, rows: int) -> None:
+    ring = TelemetryRing(path, capacity=capacity)
+    for i in range(rows):
+        ring.write(time=i, balance=i * 10, cps=1.5, clicks=i * 50, buildings=i, latency=0.001)
+    ring.close()
+
+
+def test_file_has_fixed_size(tmp_path: pathlib.Path) -> None:
+    """Tests that the file doesn't grow, however many rows are written."""
+    path = tmp_path / "telemetry.bin"
+    _fill(path, capacity=4, rows=10)
+    data = path.read_bytes()
+    assert len(data) == HEADER.size + 4 * ROW.size
+    assert HEADER.unpack_from(data)[1:] == (4, 10)
+    # rows 8 and 9 have overwritten rows 0 and 1
+    assert ROW.unpack_from(data, HEADER.size)[0] == 8
+    assert ROW.unpack_from(data, HEADER.size + 2 * ROW.size)[0] == 6
+
+
+@pytest.mark.parametrize(("rows", "expected"), ((3, [0, 1, 2]), (10, [6, 7, 8, 9])))
+def test_read_in_order(tmp_path: pathlib.Path, rows: int, expected: list[float]) -> None:
+    """Tests that analysis reads rows in chronological order, whether the buffer has wrapped or not."""
+    np = pytest.importorskip("numpy")
+    from src.analysis import read_telemetry
+
+    path = tmp_path / "telemetry.bin"
+    _fill(path, capacity=4, rows=rows)
+    chunks = read_telemetry(path)
+    assert np.concatenate([chunk["time"] for chunk in chunks]).tolist() == expected
+    assert np.concatenate([chunk["buildings"] for chunk in chunks]).tolist() == expected
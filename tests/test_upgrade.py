@@ -0,0 +1,55 @@
+"""Tests for ``src/upgrade.py``."""
+import asyncio
+import unittest.mock
+
+import pytest_mock
+
+from src.state import UpgradeState
+from src.upgrade import Upgrade, UpgradeIndex
+
+
+def _store(*keys: str) -> list[UpgradeState]:
+    return [UpgradeState(html_id=f"upgrade{i}", key=key) for i, key in enumerate(keys)]
+
+
+def _backend(mocker: pytest_mock.MockerFixture, prices: dict[str, str]) -> pytest_mock.MockType:
+    """Returns a backend, where every upgrade's tooltip shows price from ``prices`` (keyed by HTML ID)."""
+    backend: unittest.mock.AsyncMock = mocker.AsyncMock()
+    backend.read_upgrade_prices.side_effect = lambda html_ids: [prices[html_id] for html_id in html_ids]
+    return backend
+
+
+def test_by_price(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that ``by_price`` returns upgrades in the store from the cheapest, with parsed prices."""
+    index = UpgradeIndex()
+    asyncio.run(index.sync(_backend(mocker, {"upgrade0": "1,500", "upgrade1": "100"}), _store("a", "b"), 1))
+    assert index.by_price() == [Upgrade("b", "upgrade1", 100), Upgrade("a", "upgrade0", 1500)]
+
+
+def test_same_version_doesnt_read_prices(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that prices are not read again while the store hasn't changed."""
+    backend = _backend(mocker, {"upgrade0": "500"})
+    index = UpgradeIndex()
+    asyncio.run(index.sync(backend, _store("a"), 1))
+    asyncio.run(index.sync(backend, _store("a"), 1))
+    backend.read_upgrade_prices.assert_called_once()
+
+
+def test_only_new_upgrades_are_read(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that after the store has changed, only new upgrades are read, even if they moved."""
+    index = UpgradeIndex()
+    asyncio.run(index.sync(_backend(mocker, {"upgrade0": "500"}), _store("a"), 1))
+    backend = _backend(mocker, {"upgrade0": "100"})
+    asyncio.run(index.sync(backend, _store("new", "a"), 2))
+
+    assert backend.read_upgrade_prices.call_args.args[0] == ["upgrade0"]
+    assert index.by_price() == [Upgrade("new", "upgrade0", 100), Upgrade("a", "upgrade1", 500)]
+
+
+def test_remove(mocker: pytest_mock.MockerFixture) -> None:
+    """Tests that removed upgrade is not returned anymore."""
+    index = UpgradeIndex()
+    asyncio.run(index.sync(_backend(mocker, {"upgrade0": "100", "upgrade1": "200"}), _store("a", "b"), 1))
+
+    index.remove(index.by_price()[0])
+    assert index.by_price() == [Upgrade("b", "upgrade1", 200)]
@@ -0,0 +1,23 @@
+"""Tests for ``src/utils.py``."""
+import pytest
+
+from src.utils import percentile, rss_bytes
+
+
+@pytest.mark.parametrize(
+    ("values", "percent", "expected"),
+    (
+        ([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 90, 9),
+        ([1, 2, 3], 90, 3),
+        ([5], 50, 5),
+    ),
+)
+def test_percentile(values: list[float], percent: float, expected: float) -> None:
+    """Tests that ``percentile`` uses the nearest rank."""
+    assert percentile(values, percent) == expected
+
+
+def test_rss_bytes() -> None:
+    """Tests that memory usage of this process is either known and plausible, or unknown."""
+    rss = rss_bytes()
+    assert rss is None or rss > 1024 * 1024